@@ -0,0 +1,368 @@
+"""Benchmark untuk pipeline supas_converter.py
+
+Contoh penggunaan:
+    python supas_benchmark.py memory
+    python supas_benchmark.py memory --files folder/supas_extraction*.json
+    python supas_benchmark.py excel --rows 10000 100000 500000
+    python supas_benchmark.py export --rows 10000 100000 --formats xlsx csv parquet
+    python supas_benchmark.py pipeline --arts 1000000 --output hasil_benchmark.json
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource  # Peak RSS, tidak tersedia di Windows
+except ImportError:
+    resource = None
+
+LOADER_MODES = ('json', 'stream', 'app')
+EXCEL_ENGINES = ('openpyxl', 'streaming')
+EXPORT_FORMATS = ('xlsx', 'csv', 'parquet')
+WRITER_LABELS = {'excel': 'engine', 'export': 'format'}
+FILTER_SAMPLE_KEPALA_KELUARGA = 5
+
+def peak_rss_mb():
+    """Peak RSS proses saat ini dalam MB (ru_maxrss di Linux dalam KB), None jika modul resource tidak tersedia"""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _round_mb(value):
+    return None if value is None else round(value, 1)
+
+def _rss_delta(before, after):
+    """Selisih RSS dalam MB, None jika salah satu tidak terukur"""
+    return None if before is None or after is None else round(after - before, 1)
+
+def _format_mb(value, width, sign=''):
+    """Nilai MB rata kanan untuk tabel hasil; '-' jika tidak terukur (mis. di Windows)"""
+    if value is None:
+        return f"{'-':>{width}}"
+    return f"{value:>{sign}{width - 2}.1f}MB"
+
+def _measure_loader(mode, files):
+    """Dijalankan di proses terpisah: membaca file dengan loader tertentu dan mencetak hasil ukur
+
+    Mode 'app' mengukur loader yang dipakai aplikasi (flatten_supas_file per file lewat load_art_rows) dengan
+    satu worker; peak RSS-nya sama dengan peak setiap worker pada loader paralel.
+    """
+    import supas_converter as sc
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == 'app':
+        arts_data, _ = sc.load_art_rows(files, workers=1)
+        records = len({row['_id_record'] for row in arts_data or []})
+    else:
+        json_data, _ = sc.read_all_supas_files(files, streaming=(mode == 'stream'))
+        records = len(json_data['records']) if json_data else 0
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_mb()
+
+    print(json.dumps({
+        'mode': mode,
+        'records': records,
+        'seconds': round(elapsed, 3),
+        'baseline_rss_mb': _round_mb(baseline),
+        'peak_rss_mb': _round_mb(peak),
+        'peak_delta_mb': _rss_delta(baseline, peak),
+    }))
+
+def run_memory_benchmark(files):
+    """Membandingkan peak RSS loader json.load, loader streaming dan loader aplikasi, masing-masing di proses baru"""
+    results = []
+    for mode in LOADER_MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, '_measure-loader', mode, *files],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'mode':<8} {'records':>8} {'detik':>8} {'peak RSS':>10} {'delta':>10}")
+    for result in results:
+        print(
+            f"{result['mode']:<8} {result['records']:>8} {result['seconds']:>8.3f} "
+            f"{_format_mb(result['peak_rss_mb'], 10)} {_format_mb(result['peak_delta_mb'], 10)}"
+        )
+    return results
+
+def build_benchmark_frame(rows, files=None):
+    """DataFrame ART hasil export (gabungan tabel keluarga) yang diulang hingga jumlah baris tertentu"""
+    import pandas as pd
+    import supas_converter as sc
+
+    files = files or sc.find_supas_files()
+    dataset = sc.build_supas_dataset(sc.build_file_manifest(files))
+    df = sc.expand_art_table(dataset['df_full'], dataset['df_family'])
+    repeats = -(-rows // len(df))
+    return pd.concat([df] * repeats, ignore_index=True).iloc[:rows]
+
+def _benchmark_writer(kind, name):
+    """Writer (DataFrame → file-like) untuk satu engine Excel ('excel') atau format export ('export')"""
+    import supas_converter as sc
+
+    if kind == 'excel':
+        return lambda df: sc.create_excel_file(df, engine=name)
+    return sc.EXPORT_FORMATS[name]['writer']
+
+def _measure_writer(kind, name, rows):
+    """Dijalankan di proses terpisah: menulis file dengan writer tertentu dan mencetak hasil ukur"""
+    df = build_benchmark_frame(rows)
+    writer = _benchmark_writer(kind, name)
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    output = writer(df)
+    size = len(output.read())
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_mb()
+
+    print(json.dumps({
+        WRITER_LABELS[kind]: name,
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'size_mb': round(size / 1024 / 1024, 2),
+        'peak_delta_mb': _rss_delta(baseline, peak),
+    }))
+
+def run_writer_benchmark(kind, row_counts, names):
+    """Membandingkan waktu, ukuran file dan peak RSS beberapa writer (masing-masing di proses baru) untuk beberapa ukuran data"""
+    label = WRITER_LABELS[kind]
+    results = []
+    print(f"{label:<10} {'baris':>8} {'detik':>9} {'ukuran':>9} {'delta RSS':>10}")
+    for rows in row_counts:
+        for name in names:
+            output = subprocess.run(
+                [sys.executable, __file__, '_measure-writer', kind, name, str(rows)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            results.append(result)
+            print(
+                f"{result[label]:<10} {result['rows']:>8} {result['seconds']:>9.2f} "
+                f"{result['size_mb']:>7.2f}MB {_format_mb(result['peak_delta_mb'], 10)}", flush=True
+            )
+    return results
+
+def run_excel_benchmark(row_counts, engines=EXCEL_ENGINES):
+    """Membandingkan waktu dan peak RSS create_excel_file lama (openpyxl) vs streaming untuk beberapa ukuran data"""
+    return run_writer_benchmark('excel', row_counts, engines)
+
+def run_export_benchmark(row_counts, formats=EXPORT_FORMATS):
+    """Membandingkan waktu, ukuran file dan peak RSS export xlsx vs CSV vs Parquet untuk beberapa ukuran data"""
+    return run_writer_benchmark('export', row_counts, formats)
+
+def current_rss_mb():
+    """RSS proses saat ini dalam MB (dari /proc, atau peak RSS jika /proc tidak tersedia; None jika keduanya tidak ada)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+def _run_stage(results, name, func, rows_in, trace_memory=False):
+    """Menjalankan satu tahap pipeline dan mencatat waktu, jumlah baris dan memori"""
+    rss_before = current_rss_mb()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    value, rows_out = func()
+    elapsed = time.perf_counter() - start
+    traced_peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    if trace_memory:
+        tracemalloc.stop()
+
+    result = {
+        'stage': name,
+        'seconds': round(elapsed, 3),
+        'rows_in': rows_in,
+        'rows_out': rows_out,
+        'rss_before_mb': _round_mb(rss_before),
+        'rss_after_mb': _round_mb(current_rss_mb()),
+        'peak_rss_mb': _round_mb(peak_rss_mb()),
+    }
+    if traced_peak is not None:
+        result['traced_peak_mb'] = round(traced_peak / 1024 / 1024, 1)
+    results.append(result)
+    print(
+        f"{name:<24} {elapsed:>9.3f} {str(rows_in):>9} {str(rows_out):>9} "
+        f"{_format_mb(_rss_delta(result['rss_before_mb'], result['rss_after_mb']), 11, '+')} "
+        f"{_format_mb(result['peak_rss_mb'], 11)}", flush=True
+    )
+    return value
+
+def run_pipeline_benchmark(files, streaming=False, excel_rows=100000, trace_memory=False):
+    """Mengukur setiap tahap pipeline supas_converter dari file JSON sampai file Excel
+
+    Tahap: read_all_supas_files, extract_arts_from_json, clean_label_columns, add_calculated_columns,
+    sort, indeks filter, filter bertingkat (semua Provinsi → Kecamatan → Desa, dengan 'Semua' dan beberapa
+    Kepala Keluarga pertama per desa) dan create_excel_file untuk kecamatan terbesar (dibatasi excel_rows baris).
+    """
+    import pandas as pd
+    import supas_converter as sc
+
+    results = []
+    print(f"{'tahap':<24} {'detik':>9} {'baris in':>9} {'baris out':>9} {'delta RSS':>11} {'peak RSS':>11}")
+
+    json_data = _run_stage(results, 'read_all_supas_files', lambda: (
+        lambda data: (data, len(data['records']) if data else 0)
+    )(sc.read_all_supas_files(files, streaming=streaming)[0]), len(files), trace_memory)
+    if not json_data:
+        raise SystemExit("Tidak ada record yang bisa dibaca")
+
+    arts_data = _run_stage(results, 'extract_arts_from_json', lambda: (
+        lambda rows: (rows, len(rows))
+    )(sc.extract_arts_from_json(json_data, clean=False)), len(json_data['records']), trace_memory)
+    del json_data
+
+    df = _run_stage(results, 'clean_label_columns', lambda: (
+        lambda frame: (frame, len(frame))
+    )(sc.clean_label_columns(pd.DataFrame(arts_data))), len(arts_data), trace_memory)
+    del arts_data
+
+    df = _run_stage(results, 'add_calculated_columns', lambda: (
+        sc.add_calculated_columns(df), len(df)
+    ), len(df), trace_memory)
+
+    df = _run_stage(results, 'sort', lambda: (sc.sort_art_rows(df), len(df)), len(df), trace_memory)
+
+    filter_index = _run_stage(results, 'build_filter_index', lambda: (
+        lambda index: (index, sum(len(nodes['keys']) for nodes in index['nodes']))
+    )(sc.build_filter_index(df)), len(df), trace_memory)
+
+    def cascade():
+        # Seperti UI: opsi setiap level diambil lalu baris dipilih untuk setiap pilihan
+        selections = 0
+        for provinsi in sc.filter_options(filter_index, ())[1:]:
+            for kecamatan in sc.filter_options(filter_index, (provinsi,))[1:]:
+                for desa in sc.filter_options(filter_index, (provinsi, kecamatan))[1:]:
+                    options = sc.filter_options(filter_index, (provinsi, kecamatan, desa))
+                    for kepala_keluarga in options[:FILTER_SAMPLE_KEPALA_KELUARGA + 1]:
+                        sc.select_filtered_rows(df, filter_index, (provinsi, kecamatan, desa, kepala_keluarga))
+                        selections += 1
+        return selections, selections
+
+    _run_stage(results, 'cascading_filter', cascade, len(df), trace_memory)
+
+    largest = max(
+        (
+            (provinsi, kecamatan, sc.FILTER_ALL, sc.FILTER_ALL)
+            for provinsi in sc.filter_options(filter_index, ())[1:]
+            for kecamatan in sc.filter_options(filter_index, (provinsi,))[1:]
+        ),
+        key=lambda selection: len(sc.filter_positions(filter_index, selection)),
+    )
+    df_export = sc.select_filtered_rows(df, filter_index, largest).head(excel_rows)
+
+    def excel():
+        output = sc.create_excel_file(df_export)
+        size = len(output.read())
+        output.close()
+        return size, len(df_export)
+
+    excel_size = _run_stage(results, 'create_excel_file', excel, len(df_export), trace_memory)
+    results[-1]['size_mb'] = round(excel_size / 1024 / 1024, 2)
+    return results
+
+def benchmark_metadata(files):
+    """Informasi versi dan lingkungan untuk membandingkan hasil antar versi"""
+    import numpy as np
+    import pandas as pd
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'cpu_count': os.cpu_count(),
+        'files': len(files),
+        'input_mb': round(sum(os.path.getsize(path) for path in files) / 1024 / 1024, 1),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline SUPAS converter")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    memory_parser = subparsers.add_parser('memory', help="Bandingkan peak RSS loader json.load vs streaming vs loader aplikasi")
+    memory_parser.add_argument('--files', nargs='+', help="File extraction (default: supas_extraction*.json)")
+
+    excel_parser = subparsers.add_parser('excel', help="Bandingkan create_excel_file lama vs streaming")
+    excel_parser.add_argument('--rows', nargs='+', type=int, default=[10000, 100000, 500000])
+    excel_parser.add_argument('--engines', nargs='+', choices=EXCEL_ENGINES, default=list(EXCEL_ENGINES))
+
+    export_parser = subparsers.add_parser('export', help="Bandingkan export xlsx vs CSV vs Parquet")
+    export_parser.add_argument('--rows', nargs='+', type=int, default=[10000, 100000])
+    export_parser.add_argument('--formats', nargs='+', choices=EXPORT_FORMATS, default=list(EXPORT_FORMATS))
+
+    pipeline_parser = subparsers.add_parser('pipeline', help="Ukur setiap tahap pipeline pada data sintetis atau file tertentu")
+    pipeline_parser.add_argument('--files', nargs='+', help="File extraction (default: data sintetis dari supas_generator)")
+    pipeline_parser.add_argument('--arts', type=int, default=100000, help="Jumlah ART data sintetis (default: 100000)")
+    pipeline_parser.add_argument('--synthetic-files', type=int, default=4, help="Jumlah file data sintetis (default: 4)")
+    pipeline_parser.add_argument('--streaming', action='store_true', help="Pakai loader streaming")
+    pipeline_parser.add_argument('--excel-rows', type=int, default=100000, help="Batas baris untuk tahap create_excel_file")
+    pipeline_parser.add_argument('--tracemalloc', action='store_true', help="Catat puncak alokasi Python per tahap (lebih lambat)")
+    pipeline_parser.add_argument('--output', help="Simpan hasil sebagai JSON di path ini")
+
+    measure_parser = subparsers.add_parser('_measure-loader')
+    measure_parser.add_argument('mode', choices=LOADER_MODES)
+    measure_parser.add_argument('files', nargs='+')
+
+    measure_writer_parser = subparsers.add_parser('_measure-writer')
+    measure_writer_parser.add_argument('kind', choices=WRITER_LABELS)
+    measure_writer_parser.add_argument('name', choices=EXCEL_ENGINES + EXPORT_FORMATS)
+    measure_writer_parser.add_argument('rows', type=int)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'memory':
+        files = args.files or sorted(glob.glob("supas_extraction*.json"))
+        if not files:
+            parser.error("Tidak ditemukan file supas_extraction*.json")
+        run_memory_benchmark(files)
+    elif args.command == 'excel':
+        run_excel_benchmark(args.rows, args.engines)
+    elif args.command == 'export':
+        run_export_benchmark(args.rows, args.formats)
+    elif args.command == 'pipeline':
+        with tempfile.TemporaryDirectory(prefix='supas_sintetis_') as synthetic_dir:
+            files = args.files
+            if not files:
+                import supas_generator
+                files = supas_generator.generate_supas_files(synthetic_dir, args.arts, args.synthetic_files)
+            report = {
+                'metadata': benchmark_metadata(files),
+                'parameters': {
+                    'arts': None if args.files else args.arts,
+                    'streaming': args.streaming,
+                    'excel_rows': args.excel_rows,
+                },
+                'stages': run_pipeline_benchmark(files, args.streaming, args.excel_rows, args.tracemalloc),
+            }
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"Hasil disimpan ke {args.output}")
+    elif args.command == '_measure-loader':
+        _measure_loader(args.mode, args.files)
+    elif args.command == '_measure-writer':
+        _measure_writer(args.kind, args.name, args.rows)
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,374 @@
 import streamlit as st
 import pandas as pd
 import json
+import sys
+import time
+import argparse
 from io import BytesIO
 import re
 import numpy as np
 import glob
 import os
+import sqlite3
+import threading
+import importlib
+import functools
+import hashlib
+import importlib.util
+import shutil
+import tempfile
+import contextlib
+import bisect
+import multiprocessing
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+try:
+    import orjson  # Decoder JSON lebih cepat, opsional
+except ImportError:
+    orjson = None
+
+try:
+    import resource  # Peak RSS, tidak tersedia di Windows
+except ImportError:
+    resource = None
+
+SUPAS_FILE_PATTERN = "supas_extraction*.json"
+
+# Pattern untuk menangkap format '1 - 1 - Description' atau '01 - 1 - Description' (juga dengan en-dash)
+_CODE_LABEL_PATTERN = re.compile(r'^\d+\s*-\s*\d+\s*[–-]\s*(.+)$')
+CLEAN_VALUE_CACHE_SIZE = 4096
+
+# Kolom berisi label berkode yang perlu dibersihkan dengan clean_value
+LABEL_COLUMNS = (
+    'provinsi', 'kecamatan', 'desa_kelurahan', 'keberadaan_keluarga',
+    'keberadaan', 'status_hubungan', 'jenis_kelamin', 'bulan_lahir'
+)
+
+# Indeks gabungan persisten; naikkan versinya jika format baris ART berubah
+MERGE_INDEX_PATH = ".supas_merge_index.sqlite"
+MERGE_INDEX_VERSION = "3"
+
+# Ukuran potongan baca untuk mode streaming JSON
+STREAM_CHUNK_SIZE = 1 << 16
+
+# File sampai ukuran ini dibaca utuh dengan orjson (cepat); file lebih besar dibaca streaming dengan proyeksi
+# field agar memori puncak per worker loader tidak mengikuti ukuran file
+ORJSON_MAX_BYTES = 16 * 1024 * 1024
+
+# Field yang benar-benar dipakai extract_arts_from_json (sisanya dibuang saat streaming)
+_RECORD_FIELDS = ('id', 'status', 'extraction_timestamp')
+_BLOK_I_FIELDS = ('provinsi', 'kecamatan', 'desa_kelurahan', 'nks')
+_BLOK_V_FIELDS = (
+    'nama_kepala_keluarga', 'keberadaan_keluarga', 'alamat_tempat_tinggal',
+    'nomor_kartu_keluarga', 'jumlah_anggota_keluarga', 'nomor_urut_bangunan'
+)
+_ART_FIELDS = ('art_info', 'detail_data')
+
+# Loader paralel: jumlah worker (0 = jumlah CPU) dan batas minimal agar paralel dipakai
+LOAD_WORKERS = int(os.environ.get('SUPAS_LOAD_WORKERS', '0'))
+PARALLEL_MIN_FILES = 4
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+
+# Tanggal referensi perhitungan umur (September 2025)
+REFERENCE_YEAR = 2025
+REFERENCE_MONTH = 9
+
+# Mode tabel ringkas: kolom kategori/angka dan tabel keluarga terpisah (SUPAS_COMPACT_TABLE=0 untuk mematikan)
+COMPACT_TABLE = os.environ.get('SUPAS_COMPACT_TABLE', '1') != '0'
+
+# Urutan kolom df_full (dipakai saat tabel ringkas digabung kembali, mis. untuk export)
+ART_COLUMNS = [
+    'provinsi', 'kecamatan', 'desa_kelurahan', 'nks',
+    'nama_kepala_keluarga', 'keberadaan_keluarga', 'alamat_tempat_tinggal',
+    'nomor_kartu_keluarga', 'jumlah_anggota_keluarga',
+    'art_info', 'nomor_urut_anggota_keluarga', 'nik', 'nama_anggota_keluarga',
+    'keberadaan', 'status_hubungan', 'jenis_kelamin', 'tanggal_lahir', 'bulan_lahir', 'tahun_lahir',
+    'umur', 'kelas', 'sekolah', 'lulus_sd', 'lulus_smp', 'lulus_sma'
+]
+
+# Kolom lokasi/keluarga yang dipakai filter tetap di tabel ART (sebagai kategori),
+# atribut keluarga lainnya dipindah ke tabel keluarga
+LOCATION_COLUMNS = ['provinsi', 'kecamatan', 'desa_kelurahan', 'nama_kepala_keluarga']
+FAMILY_COLUMNS = ['nks', 'keberadaan_keluarga', 'alamat_tempat_tinggal', 'nomor_kartu_keluarga', 'jumlah_anggota_keluarga']
+
+# Level filter bertingkat di UI dan nilai untuk "tanpa filter"
+FILTER_LEVELS = ['provinsi', 'kecamatan', 'desa_kelurahan', 'nama_kepala_keluarga']
+FILTER_ALL = 'Semua'
+
+# nks adalah kode (mis. '00785'), bukan angka: disimpan sebagai kategori agar nol di depan tidak hilang
+CATEGORICAL_COLUMNS = LOCATION_COLUMNS + [
+    'nks', 'keberadaan', 'status_hubungan', 'jenis_kelamin', 'tanggal_lahir', 'bulan_lahir',
+    'kelas', 'sekolah', 'keberadaan_keluarga'
+]
+INTEGER_COLUMNS = [
+    'jumlah_anggota_keluarga', 'nomor_urut_anggota_keluarga', 'tahun_lahir',
+    'umur', 'lulus_sd', 'lulus_smp', 'lulus_sma'
+]
+
+# Parquet (snapshot dan download) membutuhkan pyarrow
+PARQUET_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+# Snapshot Parquet dari df_full final untuk cold start cepat; naikkan versinya jika skema/kode berubah.
+# Hanya untuk mode tabel ringkas (kolom bertipe) dan jika pyarrow tersedia.
+SNAPSHOT_DIR = ".supas_snapshot"
+SNAPSHOT_VERSION = "3"
+SNAPSHOT_ENABLED = (
+    COMPACT_TABLE
+    and os.environ.get('SUPAS_SNAPSHOT', '1') != '0'
+    and PARQUET_AVAILABLE
+)
+
+# Export Excel: 'streaming' (openpyxl write-only, ditulis per potongan ke file sementara) atau 'openpyxl' (lama)
+EXCEL_ENGINE = os.environ.get('SUPAS_EXCEL_ENGINE', 'streaming')
+EXCEL_CHUNK_ROWS = 10000
+EXCEL_MAX_COLUMN_WIDTH = 50
+EXCEL_MAX_ROWS = 1048576
+
+# File export yang sudah jadi disimpan per format dan kombinasi filter (dibagi antar sesi), dibatasi ukuran totalnya
+EXPORT_CACHE_MAX_MB = int(os.environ.get('SUPAS_EXPORT_CACHE_MB', '256'))
+EXPORT_JOB_POLL_SECONDS = 1.0
+CSV_CHUNK_ROWS = 50000
+
+# Pencarian nama/NIK: NIK placeholder (mis. 9999999999999998) tidak diindeks untuk lookup persis
+PLACEHOLDER_NIK_PATTERN = re.compile(r'^9{12}\d{4}$')
+SEARCH_COLUMNS = [
+    'nama_anggota_keluarga', 'nik', 'status_hubungan', 'keberadaan', 'nomor_kartu_keluarga'
+] + FILTER_LEVELS
+SEARCH_LIMIT = 50
+SEARCH_MIN_SIMILARITY = 0.3
+
+# Data referensi datar per ART (mis. data_jwj.json) yang direkonsiliasi dengan hasil ekstraksi:
+# join lewat NIK, lalu No. KK + No. urut anggota untuk baris dengan NIK placeholder/kosong
+REFERENCE_FILE_PATTERN = "data_*.json"
+RECONCILE_PREVIEW_ROWS = 1000
+
+# Backend query: 'pandas' (df_full di memori), 'sqlite' (database lokal terindeks) atau 'auto'
+# ('sqlite' jika total ukuran file input >= SQL_BACKEND_MIN_BYTES)
+QUERY_BACKEND = os.environ.get('SUPAS_BACKEND', 'auto')
+SQL_BACKEND_MIN_BYTES = 256 * 1024 * 1024
+ART_DB_PATH = ".supas_art.sqlite"
+ART_DB_INDEXED_COLUMNS = ['provinsi', 'kecamatan', 'desa_kelurahan', 'nama_kepala_keluarga', 'keberadaan']
+
+# Profiler tahap pipeline (waktu, jumlah baris, memori); nonaktif kecuali SUPAS_PROFILE=1.
+# Riwayat terakhir disimpan di memori dan ditambahkan ke file JSONL (diputar jika melebihi batas ukuran).
+PROFILE_ENABLED = os.environ.get('SUPAS_PROFILE', '0') == '1'
+PROFILE_LOG_PATH = os.environ.get('SUPAS_PROFILE_LOG', '.supas_profile.jsonl')
+PROFILE_LOG_MAX_BYTES = 5 * 1024 * 1024
+PROFILE_HISTORY_SIZE = 500
+
+# Laporan kualitas data (label pemeriksaan); pemeriksaan keluarga dihitung sekali per keluarga di ringkasan
+QUALITY_CHECKS = {
+    'jumlah_anggota_tidak_sesuai': "Jumlah anggota keluarga tidak sama dengan jumlah ART",
+    'nik_di_banyak_keluarga': "NIK dipakai di beberapa keluarga",
+    'nik_placeholder': "NIK placeholder",
+    'umur_kosong': "Tahun/bulan lahir tidak terbaca (umur kosong)",
+    'record_gagal': "Record hanya ada berstatus gagal",
+}
+QUALITY_FAMILY_CHECKS = ('jumlah_anggota_tidak_sesuai', 'record_gagal')
+QUALITY_FINDING_COLUMNS = [
+    'kecamatan', 'desa_kelurahan', 'nks', 'nama_kepala_keluarga', 'nomor_kartu_keluarga', 'jumlah_anggota_keluarga',
+    'nomor_urut_anggota_keluarga', 'nama_anggota_keluarga', 'nik', 'bulan_lahir', 'tahun_lahir', 'umur'
+]
+QUALITY_PREVIEW_ROWS = 1000
+
+# Pemuatan progresif saat belum ada snapshot: file dibaca di thread latar belakang mulai dari yang terbaru,
+# dan dataset sementara diterbitkan ulang setiap jumlah record bertambah PROGRESSIVE_GROWTH kali
+PROGRESSIVE_LOADING = os.environ.get('SUPAS_PROGRESSIVE', '1') != '0'
+PROGRESSIVE_GROWTH = 2.0
+PROGRESSIVE_POLL_SECONDS = 1.0
+
+# Batas memori cache tampilan terfilter (baris filter, tabel keluarga, data export) yang dibagi antar sesi
+VIEW_CACHE_MAX_MB = int(os.environ.get('SUPAS_VIEW_CACHE_MB', '256'))
+
+BULAN_MAPPING = {
+    'januari': 1, 'februari': 2, 'maret': 3, 'april': 4,
+    'mei': 5, 'juni': 6, 'juli': 7, 'agustus': 8,
+    'september': 9, 'oktober': 10, 'november': 11, 'desember': 12
+}
+
+@functools.lru_cache(maxsize=CLEAN_VALUE_CACHE_SIZE)
+def _clean_label(value):
+    match = _CODE_LABEL_PATTERN.match(value)
+    if match:
+        return match.group(1).strip()
+    return value
+
 def clean_value(value):
     """Membersihkan nilai dari format '1 - 1 - Description' menjadi hanya 'Description'"""
     if isinstance(value, str):
-        # Pattern untuk menangkap format '1 - 1 - Description' atau '01 - 1 - Description'
-        match = re.match(r'^\d+\s*-\s*\d+\s*[–-]\s*(.+)$', value)
-        if match:
-            return match.group(1).strip()
+        return _clean_label(value)
     return value
 
-def read_all_supas_files():
-    """Membaca semua file supas_extraction*.json di folder yang sama"""
-    pattern = "supas_extraction*.json"
-    files = glob.glob(pattern)
+def clean_label_rows(rows, columns=LABEL_COLUMNS):
+    """Membersihkan kolom label pada list baris ART; clean_value hanya dipanggil sekali per nilai unik"""
+    for column in columns:
+        cleaned = {}
+        for row in rows:
+            value = row[column]
+            try:
+                row[column] = cleaned[value]
+            except KeyError:
+                row[column] = cleaned[value] = clean_value(value)
+            except TypeError:
+                row[column] = clean_value(value)  # Nilai tidak hashable
+    return rows
+
+def clean_label_columns(df, columns=LABEL_COLUMNS):
+    """Membersihkan kolom label pada DataFrame: clean_value dijalankan per nilai unik lalu dipetakan kembali"""
+    for column in columns:
+        if column in df.columns:
+            codes, uniques = pd.factorize(df[column], use_na_sentinel=False)
+            cleaned = np.array([clean_value(value) for value in uniques], dtype=object)
+            df[column] = pd.Series(cleaned[codes], index=df.index, dtype=df[column].dtype)
+    return df
+
+def find_supas_files(pattern=SUPAS_FILE_PATTERN):
+    """Mencari file supas_extraction*.json, diurutkan berdasarkan nama file"""
+    return sorted(glob.glob(pattern))
+
+def build_file_manifest(files):
+    """Membuat manifest (path, ukuran, mtime) dari file yang ditemukan untuk invalidasi cache"""
+    manifest = []
+    for file_path in files:
+        stat = os.stat(file_path)
+        manifest.append((os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns))
+    return tuple(manifest)
+
+def is_preferred_record(status, timestamp, existing_status, existing_timestamp):
+    """Menentukan apakah record baru menggantikan record lama dengan ID yang sama"""
+    # Prioritas 1: status success
+    if status == 'success' and existing_status != 'success':
+        return True
+    elif existing_status == 'success' and status != 'success':
+        return False  # Keep existing
+    elif status == 'success' and existing_status == 'success':
+        # Prioritas 2: timestamp terbaru
+        return timestamp > existing_timestamp
+    return False
+
+def iter_supas_records(file_path, chunk_size=STREAM_CHUNK_SIZE):
+    """Membaca isi array 'records' satu per satu tanpa memuat seluruh file ke memori"""
+    decoder = json.JSONDecoder()
+    
+    with open(file_path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        pos = 0
+        eof = False
+        
+        def read_more(size):
+            nonlocal buffer, pos, eof
+            chunk = f.read(size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+        
+        def peek():
+            # Karakter non-spasi berikutnya, '' jika file habis
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\n\r':
+                    pos += 1
+                if pos < len(buffer):
+                    return buffer[pos]
+                if eof:
+                    return ''
+                read_more(chunk_size)
+        
+        def decode_value():
+            nonlocal pos
+            peek()
+            size = chunk_size
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                    # Angka di ujung buffer bisa saja terpotong, baca lagi untuk memastikan
+                    if end < len(buffer) or eof:
+                        pos = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                read_more(size)
+                size *= 2
+        
+        def expect(char):
+            nonlocal pos
+            if peek() != char:
+                raise ValueError(f"Format JSON tidak valid: diharapkan '{char}' di {file_path}")
+            pos += 1
+        
+        expect('{')
+        while True:
+            char = peek()
+            if char == '}':
+                return
+            if char == ',':
+                pos += 1
+                continue
+            
+            key = decode_value()
+            expect(':')
+            
+            if key == 'records' and peek() == '[':
+                pos += 1
+                while True:
+                    char = peek()
+                    if char == ']':
+                        pos += 1
+                        break
+                    if char == ',':
+                        pos += 1
+                        continue
+                    if char == '':
+                        raise ValueError(f"File terpotong: array records tidak ditutup di {file_path}")
+                    yield decode_value()
+            else:
+                decode_value()  # Lewati field lain (mis. extraction_summary)
+
+def project_record(record):
+    """Menyisakan field record yang dipakai extract_arts_from_json saja"""
+    projected = {field: record[field] for field in _RECORD_FIELDS if field in record}
+    
+    data = record.get('data', {})
+    if isinstance(data, dict):
+        projected_data = {}
+        if isinstance(data.get('page1_blok_i'), dict):
+            blok_i = data['page1_blok_i']
+            projected_data['page1_blok_i'] = {field: blok_i[field] for field in _BLOK_I_FIELDS if field in blok_i}
+        if isinstance(data.get('page2_blok_v'), dict):
+            blok_v = data['page2_blok_v']
+            projected_data['page2_blok_v'] = {field: blok_v[field] for field in _BLOK_V_FIELDS if field in blok_v}
+        if 'art_details' in data:
+            projected_data['art_details'] = [
+                {field: art[field] for field in _ART_FIELDS if field in art} if isinstance(art, dict) else art
+                for art in data['art_details']
+            ] if isinstance(data['art_details'], list) else data['art_details']
+        projected['data'] = projected_data
+    elif 'data' in record:
+        projected['data'] = data
+    
+    return projected
+
+def iter_projected_records(file_path, streaming=True):
+    """Menghasilkan record (sudah diproyeksikan jika streaming) dari satu file extraction"""
+    if streaming:
+        for record in iter_supas_records(file_path):
+            yield project_record(record)
+    else:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        yield from data.get('records', [])
+
+def read_all_supas_files(files=None, streaming=False):
+    """Membaca semua file supas_extraction*.json di folder yang sama
+    
+    Dengan streaming=True, record dibaca satu per satu dan hanya field yang dipakai yang disimpan,
+    sehingga memori puncak mengikuti ukuran hasil, bukan ukuran file terbesar.
+    """
+    if files is None:
+        files = find_supas_files()
     
     if not files:
         return None, "Tidak ditemukan file supas_extraction*.json di folder ini"
@@ -29,34 +377,20 @@ def read_all_supas_files():
     
     for file_path in files:
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                records = data.get('records', [])
-                
-                for record in records:
-                    record_id = record.get('id')
-                    if record_id:
-                        # Jika ID belum ada, tambahkan record
-                        if record_id not in all_records:
+            for record in iter_projected_records(file_path, streaming):
+                record_id = record.get('id')
+                if record_id:
+                    # Jika ID belum ada, tambahkan record
+                    if record_id not in all_records:
+                        all_records[record_id] = record
+                    else:
+                        # Jika ID sudah ada, pilih berdasarkan prioritas
+                        existing_record = all_records[record_id]
+                        if is_preferred_record(
+                            record.get('status', ''), record.get('extraction_timestamp', ''),
+                            existing_record.get('status', ''), existing_record.get('extraction_timestamp', '')
+                        ):
                             all_records[record_id] = record
-                        else:
-                            # Jika ID sudah ada, pilih berdasarkan prioritas
-                            existing_record = all_records[record_id]
-                            current_status = record.get('status', '')
-                            existing_status = existing_record.get('status', '')
-                            
-                            # Prioritas 1: status success
-                            if current_status == 'success' and existing_status != 'success':
-                                all_records[record_id] = record
-                            elif existing_status == 'success' and current_status != 'success':
-                                continue  # Keep existing
-                            elif current_status == 'success' and existing_status == 'success':
-                                # Prioritas 2: timestamp terbaru
-                                current_timestamp = record.get('extraction_timestamp', '')
-                                existing_timestamp = existing_record.get('extraction_timestamp', '')
-                                
-                                if current_timestamp > existing_timestamp:
-                                    all_records[record_id] = record
         except Exception as e:
             st.warning(f"Error reading {file_path}: {str(e)}")
     
@@ -71,111 +405,366 @@ def read_all_supas_files():
     
     return merged_data, f"Berhasil membaca {len(files)} file dan menggabungkan {len(all_records)} record unik"
 
-def add_calculated_columns(df):
-    """Menambahkan kolom perhitungan sesuai rumus yang diminta"""
-    # Set random seed for reproducible results (optional)
-    np.random.seed(42)
+def flatten_supas_file(file_path):
+    """Membaca satu file dan meratakan setiap record menjadi (id, status, timestamp, baris ART)
     
-    # Kolom umur (berdasarkan September 2025)
-    def calculate_umur(row):
+    Dipakai sebagai fungsi worker loader paralel. Jika terjadi error, record yang sudah terbaca
+    tetap dikembalikan bersama pesan error (sama seperti loader serial). File kecil dibaca utuh dengan
+    orjson jika tersedia; file di atas ORJSON_MAX_BYTES selalu dibaca streaming.
+    """
+    entries = []
+    try:
+        if orjson is not None and os.path.getsize(file_path) <= ORJSON_MAX_BYTES:
+            with open(file_path, 'rb') as f:
+                records = orjson.loads(f.read()).get('records', [])
+        else:
+            records = iter_projected_records(file_path, streaming=True)
+        
+        for record in records:
+            record_id = record.get('id')
+            if record_id:
+                entries.append((
+                    record_id,
+                    record.get('status', ''),
+                    record.get('extraction_timestamp', ''),
+                    extract_arts_from_json({'records': [record]}, clean=False)
+                ))
+    except Exception as e:
+        return entries, str(e)
+    
+    return entries, None
+
+def _worker_function(name):
+    """Fungsi worker yang bisa di-pickle ke proses lain"""
+    if __name__ == "__main__":
+        # Skrip yang berjalan sebagai __main__ (streamlit run / CLI) tidak bisa di-pickle, jadi worker diambil dari modul yang bisa diimpor
+        module = importlib.import_module(os.path.splitext(os.path.basename(__file__))[0])
+        return getattr(module, name)
+    return globals()[name]
+
+def _process_pool(workers):
+    """ProcessPoolExecutor dengan proses worker baru (forkserver/spawn), bukan fork
+    
+    Server Streamlit multithread: fork menyalin proses beserta lock yang mungkin sedang dipegang thread lain
+    sehingga worker bisa macet.
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+def flatten_supas_files(files, workers=None):
+    """Meratakan beberapa file (paralel untuk folder besar), hasil dikembalikan sesuai urutan file"""
+    if workers is None:
+        workers = LOAD_WORKERS or os.cpu_count() or 1
+    workers = min(workers, len(files))
+    
+    total_size = sum(os.path.getsize(file_path) for file_path in files)
+    if workers <= 1 or len(files) < PARALLEL_MIN_FILES or total_size < PARALLEL_MIN_BYTES:
+        # Folder kecil: overhead membuat proses lebih mahal daripada parsing-nya
+        for file_path in files:
+            yield (file_path, *flatten_supas_file(file_path))
+        return
+    
+    with _process_pool(workers) as executor:
+        for file_path, (entries, error) in zip(files, executor.map(_worker_function('flatten_supas_file'), files)):
+            yield file_path, entries, error
+
+def load_art_rows(files=None, workers=None):
+    """Membaca semua file (paralel jika perlu), menggabungkan dengan prioritas yang sama seperti
+    read_all_supas_files dan mengembalikan baris ART mentah (belum dibersihkan) hasil dedup"""
+    if files is None:
+        files = find_supas_files()
+    
+    if not files:
+        return None, "Tidak ditemukan file supas_extraction*.json di folder ini"
+    
+    merged = {}
+    for file_path, entries, error in flatten_supas_files(files, workers):
+        for record_id, status, timestamp, rows in entries:
+            if record_id not in merged or is_preferred_record(status, timestamp, *merged[record_id][:2]):
+                merged[record_id] = (status, timestamp, rows)
+        if error:
+            st.warning(f"Error reading {file_path}: {error}")
+    
+    all_arts = [row for _, _, rows in merged.values() for row in rows]
+    return all_arts, f"Berhasil membaca {len(files)} file dan menggabungkan {len(merged)} record unik"
+
+@st.cache_resource
+def _shared_state():
+    """State yang dibagi antar rerun dan sesi (modul skrip dieksekusi ulang setiap rerun)"""
+    return {
+        'merge_index_lock': threading.Lock(),
+        'snapshot_lock': threading.Lock(),
+        'snapshot_rebuild': None,
+        'progressive_lock': threading.Lock(),
+        'progressive_load': None,
+        'search_index_lock': threading.Lock(),
+        'view_cache': {
+            'lock': threading.Lock(),
+            'entries': OrderedDict(),
+            'bytes': 0,
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+        },
+        'profile': {
+            'lock': threading.Lock(),
+            'local': threading.local(),
+            'history': deque(maxlen=PROFILE_HISTORY_SIZE),
+        },
+        'export_jobs': {
+            'lock': threading.Lock(),
+            'jobs': OrderedDict(),
+            'bytes': 0,
+        },
+    }
+
+def _memory_mb():
+    """(RSS saat ini, peak RSS) proses dalam MB; None jika tidak bisa dibaca di platform ini"""
+    current = peak = None
+    try:
+        with open('/proc/self/statm') as f:
+            current = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return current, peak
+
+def start_profile_run():
+    """Menandai awal satu run skrip; tahap yang dijalankan di thread ini dicatat dengan id run ini"""
+    run_id = datetime.now().strftime('%Y%m%d%H%M%S%f')
+    _shared_state()['profile']['local'].run_id = run_id
+    return run_id
+
+def _delta(after, before):
+    return round(after - before, 1) if after is not None and before is not None else None
+
+@contextlib.contextmanager
+def _profiled_stage(name, rows_in):
+    profile = _shared_state()['profile']
+    stage = {
+        'stage': name,
+        'run': getattr(profile['local'], 'run_id', None) or 'background',
+        'started_at': datetime.now().isoformat(timespec='milliseconds'),
+        'rows_in': rows_in,
+        'rows_out': None,
+    }
+    current_before, peak_before = _memory_mb()
+    start = time.perf_counter()
+    try:
+        yield stage
+    finally:
+        stage['seconds'] = round(time.perf_counter() - start, 4)
+        current_after, peak_after = _memory_mb()
+        stage['rss_delta_mb'] = _delta(current_after, current_before)
+        stage['peak_rss_delta_mb'] = _delta(peak_after, peak_before)
+        _record_profile_stage(profile, stage)
+
+def profile_stage(name, rows_in=None):
+    """Context manager pengukur satu tahap pipeline; isi stage['rows_out'] di dalam blok
+    
+    Jika profiler nonaktif, yang dikembalikan hanya nullcontext sehingga overhead-nya bisa diabaikan.
+    """
+    if not PROFILE_ENABLED:
+        return contextlib.nullcontext({})
+    return _profiled_stage(name, rows_in)
+
+def _record_profile_stage(profile, stage):
+    """Menyimpan hasil ukur tahap ke riwayat di memori dan ke log JSONL"""
+    with profile['lock']:
+        profile['history'].append(stage)
+        if not PROFILE_LOG_PATH:
+            return
         try:
-            tahun_lahir = int(row['tahun_lahir']) if row['tahun_lahir'] and str(row['tahun_lahir']).isdigit() else None
-            bulan_lahir_text = str(row['bulan_lahir']).lower()
-            
-            if not tahun_lahir:
-                return ''
-            
-            # Mapping bulan ke angka
-            bulan_mapping = {
-                'januari': 1, 'februari': 2, 'maret': 3, 'april': 4,
-                'mei': 5, 'juni': 6, 'juli': 7, 'agustus': 8,
-                'september': 9, 'oktober': 10, 'november': 11, 'desember': 12
-            }
-            
-            bulan_lahir_num = None
-            for bulan_name, bulan_num in bulan_mapping.items():
-                if bulan_name in bulan_lahir_text:
-                    bulan_lahir_num = bulan_num
-                    break
-            
-            if not bulan_lahir_num:
-                return ''
-            
-            # Perhitungan umur berdasarkan September 2025 (bulan ke-9)
-            if bulan_lahir_num <= 9:  # September atau sebelumnya
-                umur = 2025 - tahun_lahir
-            else:  # Setelah September
-                umur = 2025 - tahun_lahir - 1
-            
-            return umur if umur >= 0 else ''
-        except:
-            return ''
+            if os.path.exists(PROFILE_LOG_PATH) and os.path.getsize(PROFILE_LOG_PATH) > PROFILE_LOG_MAX_BYTES:
+                os.replace(PROFILE_LOG_PATH, PROFILE_LOG_PATH + '.1')
+            with open(PROFILE_LOG_PATH, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(stage) + '\n')
+        except OSError:
+            pass  # Log hanya pelengkap; riwayat di memori tetap tersedia
+
+def profile_history(run=None):
+    """Riwayat tahap yang tercatat (semua, atau hanya untuk id run tertentu)"""
+    profile = _shared_state()['profile']
+    with profile['lock']:
+        return [stage for stage in profile['history'] if run is None or stage['run'] == run]
+
+def _open_merge_index(index_path):
+    """Membuka (atau membuat) database SQLite untuk indeks gabungan"""
+    conn = sqlite3.connect(index_path, timeout=30)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, rank INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS records (
+            id TEXT PRIMARY KEY, status TEXT, extraction_timestamp TEXT,
+            source_file TEXT, ord INTEGER, payload TEXT
+        );
+    """)
+    return conn
+
+def _reset_merge_index(conn):
+    """Mengosongkan indeks gabungan agar dibangun ulang dari awal"""
+    conn.execute("DELETE FROM files")
+    conn.execute("DELETE FROM records")
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (MERGE_INDEX_VERSION,))
+    conn.commit()
+
+def _merge_file_into_index(conn, file_path, entries, known, next_ord):
+    """Menggabungkan hasil flatten satu file ke indeks dengan aturan prioritas yang sama seperti read_all_supas_files"""
+    for record_id, status, timestamp, rows in entries:
+        if record_id not in known:
+            conn.execute(
+                "INSERT INTO records (id, status, extraction_timestamp, source_file, ord, payload) VALUES (?, ?, ?, ?, ?, ?)",
+                (record_id, status, timestamp, file_path, next_ord, json.dumps(rows, ensure_ascii=False))
+            )
+            known[record_id] = (status, timestamp)
+            next_ord += 1
+        elif is_preferred_record(status, timestamp, *known[record_id]):
+            # Posisi (ord) tetap, sama seperti penggantian nilai di dict
+            conn.execute(
+                "UPDATE records SET status = ?, extraction_timestamp = ?, source_file = ?, payload = ? WHERE id = ?",
+                (status, timestamp, file_path, json.dumps(rows, ensure_ascii=False), record_id)
+            )
+            known[record_id] = (status, timestamp)
     
-    df['umur'] = df.apply(calculate_umur, axis=1)
+    return next_ord
+
+def sync_merge_index(files, index_path=MERGE_INDEX_PATH, workers=None):
+    """Memperbarui indeks gabungan dengan file baru saja dan mengembalikan baris ART mentah hasil dedup
     
-    # Kolom kelas dan sekolah berdasarkan umur (6-18 tahun)
-    def calculate_kelas_sekolah(row):
+    Indeks hanya bisa diperbarui secara inkremental jika file lama tidak berubah dan file baru
+    berada di akhir urutan nama file; selain itu indeks dibangun ulang agar hasilnya tetap sama
+    persis dengan read_all_supas_files + extract_arts_from_json.
+    """
+    if not files:
+        return None, "Tidak ditemukan file supas_extraction*.json di folder ini"
+    
+    manifest = build_file_manifest(files)
+    
+    with _shared_state()['merge_index_lock']:
+        conn = _open_merge_index(index_path)
         try:
-            umur = row['umur']
-            if umur == '' or not isinstance(umur, (int, float)):
-                return '', ''
+            version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            indexed = [tuple(row) for row in conn.execute("SELECT path, size, mtime_ns FROM files ORDER BY rank")]
             
-            umur = int(umur)
+            if version is None or version[0] != MERGE_INDEX_VERSION or tuple(indexed) != manifest[:len(indexed)]:
+                _reset_merge_index(conn)
+                indexed = []
             
-            # Umur 6-12: SD (kelas 1-6, diluar usia +1)
-            if 6 <= umur <= 12:
-                kelas = umur - 5  # umur 6 = kelas 1, umur 12 = kelas 6
-                if kelas > 6:
-                    kelas = 6
-                return f"{kelas}", "SD"
-            # Umur 13-15: SMP (kelas 1-3)
-            elif 13 <= umur <= 15:
-                kelas = umur - 12  # umur 13 = kelas 1, umur 15 = kelas 3
-                return f"{kelas}", "SMP"
-            # Umur 16-18: SMA (kelas 1-3)
-            elif 16 <= umur <= 18:
-                kelas = umur - 15  # umur 16 = kelas 1, umur 18 = kelas 3
-                return f"{kelas}", "SMA"
-            else:
-                return '', ''
-        except:
-            return '', ''
+            new_files = manifest[len(indexed):]
+            if new_files:
+                # Baca + flatten file baru dan gabungkan ke indeks (per file, saling bertumpuk)
+                with profile_stage('baca_gabung_file_baru', len(new_files)) as stage:
+                    known = {
+                        record_id: (status, timestamp)
+                        for record_id, status, timestamp in conn.execute("SELECT id, status, extraction_timestamp FROM records")
+                    }
+                    next_ord = conn.execute("SELECT COALESCE(MAX(ord) + 1, 0) FROM records").fetchone()[0]
+                    
+                    flattened = flatten_supas_files([file_path for file_path, _, _ in new_files], workers)
+                    for rank, ((file_path, size, mtime_ns), (_, entries, error)) in enumerate(
+                        zip(new_files, flattened), start=len(indexed)
+                    ):
+                        next_ord = _merge_file_into_index(conn, file_path, entries, known, next_ord)
+                        if error:
+                            st.warning(f"Error reading {file_path}: {error}")
+                        conn.execute(
+                            "INSERT OR REPLACE INTO files (path, size, mtime_ns, rank) VALUES (?, ?, ?, ?)",
+                            (file_path, size, mtime_ns, rank)
+                        )
+                        conn.commit()
+                    stage['rows_out'] = next_ord
+            
+            with profile_stage('muat_baris_gabungan') as stage:
+                all_arts = []
+                total_records = 0
+                for (payload,) in conn.execute("SELECT payload FROM records ORDER BY ord"):
+                    all_arts.extend(json.loads(payload))
+                    total_records += 1
+                stage['rows_in'], stage['rows_out'] = total_records, len(all_arts)
+        finally:
+            conn.close()
     
-    # Terapkan fungsi kelas dan sekolah
-    kelas_sekolah_data = df.apply(calculate_kelas_sekolah, axis=1, result_type='expand')
-    df['kelas'] = kelas_sekolah_data[0]
-    df['sekolah'] = kelas_sekolah_data[1]
+    message = f"Berhasil membaca {len(files)} file dan menggabungkan {total_records} record unik"
+    if indexed:
+        message += f" ({len(new_files)} file baru diproses, {len(indexed)} dari indeks)"
+    return all_arts, message
+
+def _parse_tahun_lahir(value):
+    """Parse tahun lahir; None jika kosong/tidak valid (sama seperti aturan isdigit sebelumnya)"""
+    try:
+        return int(value) if value and str(value).isdigit() else None
+    except:
+        return None
+
+def _parse_bulan_lahir(value):
+    """Mencari nomor bulan dari teks bulan lahir (mis. '06 - Juni'), None jika tidak ditemukan"""
+    bulan_lahir_text = str(value).lower()
+    for bulan_name, bulan_num in BULAN_MAPPING.items():
+        if bulan_name in bulan_lahir_text:
+            return bulan_num
+    return None
+
+def _map_distinct(series, parser):
+    """Menjalankan parser sekali per nilai unik lalu memetakan hasilnya ke seluruh kolom (float, NaN = tidak valid)"""
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    parsed = np.array([parser(value) for value in uniques], dtype=float)
+    return parsed[codes] if len(codes) else np.array([], dtype=float)
+
+def _to_column(values, valid, index):
+    """Membuat kolom hasil: angka (int Python) untuk baris valid, '' untuk lainnya"""
+    column = np.full(len(index), '', dtype=object)
+    column[valid] = values[valid].astype(int).tolist()
+    return pd.Series(column, index=index).infer_objects()
+
+def add_calculated_columns(df, reference_year=REFERENCE_YEAR, reference_month=REFERENCE_MONTH):
+    """Menambahkan kolom perhitungan sesuai rumus yang diminta
     
-    # Kolom pendidikan - lulus_sd, lulus_smp, lulus_sma
-    def calculate_lulus_sd(row):
-        try:
-            tahun_lahir = int(row['tahun_lahir']) if row['tahun_lahir'] and str(row['tahun_lahir']).isdigit() else None
-            return tahun_lahir + 12 if tahun_lahir else ''
-        except:
-            return ''
+    Semua perhitungan dilakukan per kolom: tahun dan bulan lahir di-parse sekali per nilai unik,
+    lalu umur, kelas/sekolah dan tahun lulus dihitung dengan operasi numpy.
+    """
+    # Set random seed for reproducible results (optional)
+    np.random.seed(42)
     
-    def calculate_lulus_smp(row):
-        try:
-            tahun_lahir = int(row['tahun_lahir']) if row['tahun_lahir'] and str(row['tahun_lahir']).isdigit() else None
-            return tahun_lahir + 15 if tahun_lahir else ''
-        except:
-            return ''
+    tahun_lahir = _map_distinct(df['tahun_lahir'], _parse_tahun_lahir)
+    bulan_lahir = _map_distinct(df['bulan_lahir'], _parse_bulan_lahir)
     
-    def calculate_lulus_sma(row):
-        try:
-            tahun_lahir = int(row['tahun_lahir']) if row['tahun_lahir'] and str(row['tahun_lahir']).isdigit() else None
-            return tahun_lahir + 18 if tahun_lahir else ''
-        except:
-            return ''
+    # Tahun 0 dianggap tidak valid, sama seperti sebelumnya
+    tahun_valid = ~np.isnan(tahun_lahir) & (tahun_lahir != 0)
+    
+    # Kolom umur (berdasarkan bulan & tahun referensi, default September 2025)
+    umur = reference_year - tahun_lahir - (bulan_lahir > reference_month)
+    umur_valid = tahun_valid & ~np.isnan(bulan_lahir) & (umur >= 0)
+    df['umur'] = _to_column(umur, umur_valid, df.index)
     
-    df['lulus_sd'] = df.apply(calculate_lulus_sd, axis=1)
-    df['lulus_smp'] = df.apply(calculate_lulus_smp, axis=1)
-    df['lulus_sma'] = df.apply(calculate_lulus_sma, axis=1)
+    # Kolom kelas dan sekolah berdasarkan umur (6-18 tahun)
+    # Umur 6-12: SD (kelas 1-6, diluar usia +1), 13-15: SMP (kelas 1-3), 16-18: SMA (kelas 1-3)
+    umur_filled = np.where(umur_valid, umur, -1)
+    conditions = [
+        (umur_filled >= 6) & (umur_filled <= 12),
+        (umur_filled >= 13) & (umur_filled <= 15),
+        (umur_filled >= 16) & (umur_filled <= 18),
+    ]
+    kelas = np.select(conditions, [np.minimum(umur_filled - 5, 6), umur_filled - 12, umur_filled - 15], default=0).astype(int)
+    sekolah = np.select(conditions, ['SD', 'SMP', 'SMA'], default='')
+    df['kelas'] = np.where(sekolah != '', kelas.astype(str), '')
+    df['sekolah'] = sekolah
+    
+    # Kolom pendidikan - lulus_sd, lulus_smp, lulus_sma
+    df['lulus_sd'] = _to_column(tahun_lahir + 12, tahun_valid, df.index)
+    df['lulus_smp'] = _to_column(tahun_lahir + 15, tahun_valid, df.index)
+    df['lulus_sma'] = _to_column(tahun_lahir + 18, tahun_valid, df.index)
     
     return df
 
-def extract_arts_from_json(json_data):
-    """Ekstrak semua ART dari data JSON dan konversi ke format tabular"""
+def extract_arts_from_json(json_data, clean=True):
+    """Ekstrak semua ART dari data JSON dan konversi ke format tabular
+    
+    Dengan clean=False label berkode ('1 - 1 - Laki-laki') dibiarkan mentah agar bisa dibersihkan
+    per kolom sekaligus oleh clean_label_columns setelah menjadi DataFrame.
+    """
     all_arts = []
     
     records = json_data.get('records', [])
@@ -186,9 +775,9 @@ def extract_arts_from_json(json_data):
         # Informasi lokasi dari page1_blok_i
         blok_i = data.get('page1_blok_i', {})
         location_info = {
-            'provinsi': clean_value(blok_i.get('provinsi', '')),
-            'kecamatan': clean_value(blok_i.get('kecamatan', '')),
-            'desa_kelurahan': clean_value(blok_i.get('desa_kelurahan', '')),
+            'provinsi': blok_i.get('provinsi', ''),
+            'kecamatan': blok_i.get('kecamatan', ''),
+            'desa_kelurahan': blok_i.get('desa_kelurahan', ''),
             'nks': blok_i.get('nks', '')
         }
         
@@ -196,12 +785,15 @@ def extract_arts_from_json(json_data):
         blok_v = data.get('page2_blok_v', {})
         family_info = {
             'nama_kepala_keluarga': blok_v.get('nama_kepala_keluarga', ''),
-            'keberadaan_keluarga': clean_value(blok_v.get('keberadaan_keluarga', '')),
+            'keberadaan_keluarga': blok_v.get('keberadaan_keluarga', ''),
             'alamat_tempat_tinggal': blok_v.get('alamat_tempat_tinggal', ''),
             'nomor_kartu_keluarga': blok_v.get('nomor_kartu_keluarga', ''),
             'jumlah_anggota_keluarga': blok_v.get('jumlah_anggota_keluarga', ''),
             # Simpan untuk sorting tapi akan dihapus nanti
-            '_nomor_urut_bangunan_sort': blok_v.get('nomor_urut_bangunan', '')
+            '_nomor_urut_bangunan_sort': blok_v.get('nomor_urut_bangunan', ''),
+            # ID dan status record pemenang gabungan, untuk laporan kualitas data (dihapus bersama kolom sort)
+            '_id_record': record.get('id', ''),
+            '_status_record': record.get('status', '')
         }
         
         # Ekstrak ART details
@@ -219,11 +811,11 @@ def extract_arts_from_json(json_data):
                     'nomor_urut_anggota_keluarga': art_info.get('nomor_urut_anggota_keluarga', ''),
                     'nik': art_info.get('nik', ''),
                     'nama_anggota_keluarga': art_info.get('nama_anggota_keluarga', ''),
-                    'keberadaan': clean_value(art_info.get('keberadaan', '')),
-                    'status_hubungan': clean_value(art_info.get('status_hubungan', '')),
-                    'jenis_kelamin': clean_value(art_info.get('jenis_kelamin', '')),
+                    'keberadaan': art_info.get('keberadaan', ''),
+                    'status_hubungan': art_info.get('status_hubungan', ''),
+                    'jenis_kelamin': art_info.get('jenis_kelamin', ''),
                     'tanggal_lahir': art_info.get('tanggal_lahir', ''),
-                    'bulan_lahir': clean_value(art_info.get('bulan_lahir', '')),
+                    'bulan_lahir': art_info.get('bulan_lahir', ''),
                     'tahun_lahir': art_info.get('tahun_lahir', '')
                 }
                 
@@ -246,10 +838,25 @@ def extract_arts_from_json(json_data):
             }
             all_arts.append(art_row)
     
+    if clean:
+        clean_label_rows(all_arts)
+    
     return all_arts
 
-def create_excel_file(df):
-    """Membuat file Excel dari DataFrame"""
+def create_excel_file(df, engine=None, progress=None):
+    """Membuat file Excel dari DataFrame
+    
+    progress (opsional) dipanggil dengan (baris_tertulis, total_baris) selama workbook ditulis.
+    """
+    if (engine or EXCEL_ENGINE) == 'openpyxl':
+        output = _create_excel_file_openpyxl(df)
+        if progress is not None:
+            progress(len(df), len(df))
+        return output
+    return _create_excel_file_streaming(df, progress)
+
+def _create_excel_file_openpyxl(df):
+    """Membuat file Excel dari DataFrame lewat pandas + openpyxl (seluruh workbook di memori)"""
     output = BytesIO()
     
     with pd.ExcelWriter(output, engine='openpyxl') as writer:
@@ -267,12 +874,1655 @@ def create_excel_file(df):
                         max_length = len(str(cell.value))
                 except:
                     pass
-            adjusted_width = min(max_length + 2, 50)  # Max width 50
+            adjusted_width = min(max_length + 2, EXCEL_MAX_COLUMN_WIDTH)  # Max width 50
             worksheet.column_dimensions[column_letter].width = adjusted_width
     
     output.seek(0)
     return output
 
+def _column_text_width(series):
+    """Panjang teks terpanjang di kolom seperti yang dihitung dari sel Excel (nilai kosong ditulis sebagai '')"""
+    if len(series) == 0:
+        return 0
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Cukup hitung panjang kategori yang benar-benar dipakai
+        codes = np.unique(series.cat.codes.to_numpy())
+        lengths = [len(str(series.cat.categories[code])) if code >= 0 else 0 for code in codes]
+        return max(lengths)
+    lengths = series.astype(str).str.len()
+    lengths[series.isna().to_numpy()] = 0
+    return int(lengths.max())
+
+def _create_excel_file_streaming(df, progress=None):
+    """Membuat file Excel dengan openpyxl write-only: baris ditulis per potongan dan workbook di-spool ke file sementara
+    
+    Lebar kolom dihitung dari panjang string per kolom DataFrame (maksimal 50), bukan dengan membaca ulang setiap sel.
+    """
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+    
+    if len(df) + 1 > EXCEL_MAX_ROWS:
+        raise ValueError(f"Data terlalu besar untuk satu sheet Excel: {len(df)} baris (maksimal {EXCEL_MAX_ROWS - 1})")
+    
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('Data ART')
+    
+    # Lebar kolom harus diatur sebelum baris ditulis pada mode write-only
+    for position, column in enumerate(df.columns, start=1):
+        max_length = max(len(str(column)), _column_text_width(df[column]))
+        worksheet.column_dimensions[get_column_letter(position)].width = min(max_length + 2, EXCEL_MAX_COLUMN_WIDTH)
+    
+    worksheet.append([str(column) for column in df.columns])
+    
+    for start in range(0, len(df), EXCEL_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXCEL_CHUNK_ROWS].astype(object)
+        chunk = chunk.where(chunk.notna(), '')
+        for row in chunk.to_numpy().tolist():
+            worksheet.append(row)
+        if progress is not None:
+            progress(start + len(chunk), len(df))
+    
+    return _spool_to_reader(workbook.save)
+
+def _spool_to_reader(write):
+    """Menjalankan write(path) ke file sementara dan mengembalikan handle baca (file sudah di-unlink)"""
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        write(path)
+        output = open(path, 'rb')
+    finally:
+        try:
+            os.unlink(path)  # Di POSIX isi file tetap bisa dibaca lewat handle yang masih terbuka
+        except OSError:
+            pass
+    return output
+
+def create_csv_file(df, progress=None):
+    """Membuat file CSV (UTF-8 dengan BOM agar terbaca benar di Excel), ditulis per potongan ke file sementara"""
+    def write(path):
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            if len(df) == 0:
+                df.to_csv(f, index=False)
+            for start in range(0, len(df), CSV_CHUNK_ROWS):
+                chunk = df.iloc[start:start + CSV_CHUNK_ROWS]
+                chunk.to_csv(f, index=False, header=(start == 0))
+                if progress is not None:
+                    progress(start + len(chunk), len(df))
+    
+    return _spool_to_reader(write)
+
+def create_parquet_file(df, progress=None):
+    """Membuat file Parquet dengan kolom bertipe (angka sebagai integer nullable, kolom berulang sebagai kategori)
+    
+    NKS tetap ditulis sebagai kode teks (nol di depan, mis. '00785', ikut terbaca); nilai angkanya
+    ditulis di kolom nks_angka tepat di sebelahnya.
+    """
+    if not PARQUET_AVAILABLE:
+        raise ValueError("Export Parquet membutuhkan paket pyarrow")
+    
+    typed = _compact_columns(df.copy(deep=False))
+    if 'nks' in typed.columns:
+        typed.insert(typed.columns.get_loc('nks') + 1, 'nks_angka', _to_int32(typed['nks'].astype(str)))
+    output = _spool_to_reader(lambda path: typed.to_parquet(path, index=False))
+    if progress is not None:
+        progress(len(df), len(df))
+    return output
+
+EXPORT_FORMATS = {
+    'xlsx': {
+        'label': 'Excel',
+        'writer': create_excel_file,
+        'mime': "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    },
+    'csv': {
+        'label': 'CSV',
+        'writer': create_csv_file,
+        'mime': "text/csv",
+    },
+    'parquet': {
+        'label': 'Parquet',
+        'writer': create_parquet_file,
+        'mime': "application/vnd.apache.parquet",
+    },
+}
+
+def available_export_formats():
+    """Format download yang bisa dipakai di lingkungan ini (Parquet hanya jika pyarrow tersedia)"""
+    return [name for name in EXPORT_FORMATS if name != 'parquet' or PARQUET_AVAILABLE]
+
+def _run_export_job(job, df):
+    """Dijalankan di thread latar belakang: menulis file export dan menyimpan hasilnya di job"""
+    def update_progress(rows_written, total_rows):
+        job['rows_written'] = rows_written
+    
+    try:
+        with profile_stage(f"buat_file_{job['format']}", len(df)) as stage:
+            output = EXPORT_FORMATS[job['format']]['writer'](df, progress=update_progress)
+            stage['rows_out'] = len(df)
+        try:
+            data = output.read()
+        finally:
+            output.close()
+    except Exception as e:
+        job['error'] = str(e)
+        job['status'] = 'error'
+        return
+    
+    export_jobs = job['cache']
+    with export_jobs['lock']:
+        job['data'] = data
+        job['size'] = len(data)
+        job['finished_at'] = datetime.now()
+        job['status'] = 'done'
+        export_jobs['bytes'] += len(data)
+        
+        # Buang file paling lama tidak dipakai jika melebihi batas (job yang masih berjalan dilewati)
+        limit = EXPORT_CACHE_MAX_MB * 1024 * 1024
+        for key in list(export_jobs['jobs']):
+            if export_jobs['bytes'] <= limit:
+                break
+            cached_job = export_jobs['jobs'][key]
+            if cached_job['status'] == 'done' and cached_job is not job:
+                del export_jobs['jobs'][key]
+                export_jobs['bytes'] -= cached_job['size']
+
+def start_export_job(key, df, filename, export_format='xlsx'):
+    """Mulai membuat file export untuk kunci (dataset, pilihan filter, format) di thread latar belakang
+    
+    Jika file untuk kunci ini sedang dibuat atau sudah jadi, job yang ada dikembalikan.
+    """
+    export_jobs = _shared_state()['export_jobs']
+    with export_jobs['lock']:
+        job = export_jobs['jobs'].get(key)
+        if job is not None and job['status'] != 'error':
+            export_jobs['jobs'].move_to_end(key)
+            return job
+        
+        job = {
+            'status': 'running',
+            'format': export_format,
+            'rows_written': 0,
+            'total_rows': len(df),
+            'filename': filename,
+            'data': None,
+            'size': 0,
+            'error': None,
+            'cache': export_jobs,
+        }
+        export_jobs['jobs'][key] = job
+    
+    threading.Thread(target=_run_export_job, args=(job, df), daemon=True).start()
+    return job
+
+def get_export_job(key):
+    """Job export untuk kunci (dataset, pilihan filter, format), None jika belum pernah dibuat"""
+    export_jobs = _shared_state()['export_jobs']
+    with export_jobs['lock']:
+        job = export_jobs['jobs'].get(key)
+        if job is not None:
+            export_jobs['jobs'].move_to_end(key)
+        return job
+
+@st.fragment(run_every=EXPORT_JOB_POLL_SECONDS)
+def show_export_job_progress(key):
+    """Progress pembuatan file export; hanya bagian ini yang di-rerun sampai job selesai"""
+    job = get_export_job(key)
+    if job is None or job['status'] != 'running':
+        st.rerun()
+    
+    total_rows = max(job['total_rows'], 1)
+    st.progress(
+        min(job['rows_written'] / total_rows, 1.0),
+        text=f"Membuat file {EXPORT_FORMATS[job['format']]['label']}... {job['rows_written']}/{job['total_rows']} baris"
+    )
+
+def process_art_rows(arts_data):
+    """Mengubah baris ART mentah (extract_arts_from_json dengan clean=False) menjadi DataFrame lengkap yang sudah terurut"""
+    with profile_stage('bersihkan_label', len(arts_data)) as stage:
+        df_full = pd.DataFrame(arts_data)
+        df_full = clean_label_columns(df_full)
+        stage['rows_out'] = len(df_full)
+    
+    with profile_stage('kolom_perhitungan', len(df_full)) as stage:
+        df_full = add_calculated_columns(df_full)
+        stage['rows_out'] = len(df_full)
+    
+    with profile_stage('urutkan', len(df_full)) as stage:
+        df_full = sort_art_rows(df_full)
+        stage['rows_out'] = len(df_full)
+    return df_full
+
+def sort_art_rows(df_full):
+    """Mengurutkan baris ART berdasarkan nks dan nomor_urut_bangunan, lalu membuang kolom bantu sort"""
+    # Sort berdasarkan nks dan nomor_urut_bangunan
+    df_full['_nks_sort'] = pd.to_numeric(df_full['nks'], errors='coerce').fillna(0)
+    df_full['_nomor_urut_bangunan_sort_num'] = pd.to_numeric(df_full['_nomor_urut_bangunan_sort'], errors='coerce').fillna(0)
+    
+    df_full = df_full.sort_values(['_nks_sort', '_nomor_urut_bangunan_sort_num'])
+    
+    # Hapus kolom helper untuk sorting (dan ID/status record, jika ada)
+    df_full = df_full.drop(
+        columns=['_nks_sort', '_nomor_urut_bangunan_sort_num', '_nomor_urut_bangunan_sort', '_id_record', '_status_record'],
+        errors='ignore'
+    )
+    
+    return df_full
+
+def _compact_columns(df):
+    """Mengubah kolom berulang menjadi kategori dan kolom angka menjadi integer nullable"""
+    for column in df.columns:
+        if column in CATEGORICAL_COLUMNS:
+            df[column] = df[column].astype('category')
+        elif column in INTEGER_COLUMNS:
+            df[column] = _to_int32(df[column])
+    return df
+
+def _to_int32(series):
+    """Kolom teks angka menjadi Int32 nullable; kosong, bukan angka, pecahan (2.5) dan di luar rentang int32 menjadi <NA>"""
+    values = pd.to_numeric(series.replace('', np.nan), errors='coerce').astype(float)
+    info = np.iinfo(np.int32)
+    valid = (values == np.floor(values)) & (values >= info.min) & (values <= info.max)
+    return values.where(valid).astype('Int32')
+
+def compact_art_table(df_full):
+    """Memecah df_full menjadi tabel ART ringkas dan tabel keluarga
+    
+    Tabel ART menyimpan kolom ART, kolom filter lokasi (kategori) dan `_family_id`; atribut keluarga
+    lain disimpan sekali per keluarga di tabel keluarga. Nilai angka yang tidak valid menjadi <NA>.
+    """
+    family_id = df_full.groupby(LOCATION_COLUMNS + FAMILY_COLUMNS, sort=False, dropna=False).ngroup()
+    
+    df_family = df_full[FAMILY_COLUMNS].copy()
+    df_family['_family_id'] = family_id.to_numpy()
+    df_family = df_family.drop_duplicates('_family_id').set_index('_family_id').sort_index()
+    
+    df_art = df_full.drop(columns=FAMILY_COLUMNS)
+    df_art['_family_id'] = family_id.astype('int32')
+    
+    return _compact_columns(df_art), _compact_columns(df_family)
+
+def expand_art_table(df_art, df_family):
+    """Menggabungkan kembali tabel ART ringkas dengan tabel keluarga (urutan kolom sama seperti df_full)"""
+    if df_family is None:
+        return df_art
+    
+    df_joined = df_art.join(df_family, on='_family_id')
+    return df_joined[[column for column in ART_COLUMNS if column in df_joined.columns]]
+
+def _is_filter_option(value):
+    """Nilai yang boleh muncul sebagai pilihan filter (bukan kosong/NaN)"""
+    return bool(value) and str(value) != 'nan'
+
+def build_filter_index(df):
+    """Membangun pohon prefix filter Provinsi → Kecamatan → Desa → Kepala Keluarga sekali per dataset
+    
+    Nilai setiap level diberi kode sesuai urutan terurutnya, lalu baris diurutkan sekali berdasarkan
+    kode keempat level. Setiap node (prefix pilihan tanpa 'Semua' di tengah) menjadi rentang [start, end)
+    di urutan tersebut, sehingga opsi level berikutnya dan posisi baris cukup dicari dengan pencarian
+    biner. Pilihan dengan 'Semua' di tengah dilayani saat dibutuhkan dengan menyaring posisi di bawah
+    node terdalam yang dipilih.
+    """
+    levels = []
+    key = np.zeros(len(df), dtype=np.int64)
+    for level in FILTER_LEVELS:
+        codes, uniques = pd.factorize(df[level], use_na_sentinel=False)
+        uniques = list(uniques)  # Akses elemen Categorical satu per satu lambat
+        ordering = sorted(range(len(uniques)), key=lambda i: str(uniques[i]))
+        rank = np.empty(len(uniques), dtype=np.int64)
+        rank[ordering] = np.arange(len(uniques))
+        values = [uniques[i] for i in ordering]
+        width = max(len(values).bit_length(), 1)
+        levels.append({
+            'values': values,
+            'lookup': {value: code for code, value in enumerate(values)},
+            'selectable': np.array([_is_filter_option(value) for value in values], dtype=bool),
+            'codes': rank[codes].astype(np.int32),
+            'width': width,
+        })
+        key = (key << width) | rank[codes]
+    
+    if sum(level['width'] for level in levels) > 62:
+        raise ValueError("Terlalu banyak nilai unik untuk indeks filter")
+    
+    order = np.argsort(key, kind='stable').astype(np.int32)
+    sorted_key = key[order]
+    nodes = []
+    shift = sum(level['width'] for level in levels)
+    for level in levels:
+        shift -= level['width']
+        prefix_key = sorted_key >> shift
+        starts = np.flatnonzero(np.concatenate([[True], prefix_key[1:] != prefix_key[:-1]])) if len(df) else np.array([], dtype=np.int64)
+        nodes.append({
+            'keys': prefix_key[starts],
+            'starts': starts,
+            'ends': np.append(starts[1:], len(df)),
+        })
+    
+    return {'levels': levels, 'order': order, 'nodes': nodes}
+
+def _level_code(filter_index, level, value):
+    """Kode nilai pada satu level, None jika nilai tidak ada atau tidak bisa dipilih"""
+    level = filter_index['levels'][level]
+    code = level['lookup'].get(value)
+    if code is None or not level['selectable'][code]:
+        return None
+    return code
+
+def resolve_filter_selection(filter_index, selection):
+    """Memecah pilihan filter menjadi node terdalam tanpa 'Semua' dan level terpilih sesudahnya
+    
+    Mengembalikan (kedalaman, id node, start, end, [(level, kode), ...]); None jika ada nilai yang tidak ada di data.
+    """
+    selection = tuple(selection)
+    depth = 0
+    while depth < len(selection) and selection[depth] != FILTER_ALL:
+        depth += 1
+    
+    node, start, end = None, 0, len(filter_index['order'])
+    if depth:
+        key = 0
+        for level, value in enumerate(selection[:depth]):
+            code = _level_code(filter_index, level, value)
+            if code is None:
+                return None
+            key = (key << filter_index['levels'][level]['width']) | code
+        nodes = filter_index['nodes'][depth - 1]
+        node = int(np.searchsorted(nodes['keys'], key))
+        if node == len(nodes['keys']) or nodes['keys'][node] != key:
+            return None
+        start, end = int(nodes['starts'][node]), int(nodes['ends'][node])
+    
+    extra = []
+    for level in range(depth, len(selection)):
+        if selection[level] != FILTER_ALL:
+            code = _level_code(filter_index, level, selection[level])
+            if code is None:
+                return None
+            extra.append((level, code))
+    return depth, node, start, end, extra
+
+def _resolved_positions(filter_index, resolved):
+    """Posisi baris (urutan pohon, belum diurutkan) untuk pilihan hasil resolve_filter_selection"""
+    _, _, start, end, extra = resolved
+    positions = filter_index['order'][start:end]
+    for level, code in extra:
+        positions = positions[filter_index['levels'][level]['codes'][positions] == code]
+    return positions
+
+def filter_positions(filter_index, selection):
+    """Posisi baris (urutan df) untuk pilihan filter; None jika kombinasi tidak ada di data"""
+    resolved = resolve_filter_selection(filter_index, selection)
+    if resolved is None:
+        return None
+    return np.sort(_resolved_positions(filter_index, resolved))
+
+def filter_options(filter_index, prefix):
+    """Opsi selectbox untuk level berikutnya berdasarkan pilihan level di atasnya"""
+    resolved = resolve_filter_selection(filter_index, prefix)
+    if resolved is None:
+        return [FILTER_ALL]
+    
+    depth, _, start, end, extra = resolved
+    level = filter_index['levels'][len(prefix)]
+    if depth == len(prefix):
+        # Prefix tanpa 'Semua': opsi = anak node, yaitu node level berikutnya di dalam rentang [start, end)
+        nodes = filter_index['nodes'][depth]
+        first, last = np.searchsorted(nodes['starts'], [start, end])
+        codes = nodes['keys'][first:last] & ((1 << level['width']) - 1)
+    else:
+        codes = np.unique(level['codes'][_resolved_positions(filter_index, (depth, None, start, end, extra))])
+    return [FILTER_ALL] + [level['values'][code] for code in codes if level['selectable'][code]]
+
+def select_filtered_rows(df, filter_index, selection):
+    """Mengambil baris sesuai pilihan filter lewat indeks (tanpa boolean mask)"""
+    positions = filter_positions(filter_index, selection)
+    if positions is None:
+        return df.iloc[0:0]
+    if len(positions) == len(df):
+        return df.copy()
+    return df.iloc[positions]
+
+def summarize_art_rows(df):
+    """Ringkasan angka untuk metrik, panel Ringkasan dan info download dari DataFrame terfilter"""
+    ditemukan = (df['keberadaan'] == 'Ditemukan').to_numpy()
+    kepala_keluarga = (df['status_hubungan'] == 'Kepala Keluarga').to_numpy()
+    kepala_keluarga_ditemukan = int((ditemukan & kepala_keluarga).sum())
+    return {
+        'total': len(df),
+        'ditemukan': int(ditemukan.sum()),
+        'keluarga': int(df['nama_kepala_keluarga'].nunique()),
+        'kepala_keluarga': int(kepala_keluarga.sum()),
+        'kepala_keluarga_ditemukan': kepala_keluarga_ditemukan,
+        'anggota_lain_ditemukan': int(ditemukan.sum()) - kepala_keluarga_ditemukan,
+    }
+
+def build_summary_cube(df, filter_index):
+    """Membangun ringkasan per node pohon filter sekali per dataset
+    
+    Setiap level prefix punya satu DataFrame agregat dengan indeks id node yang sama seperti
+    filter_index['nodes'], sehingga metrik untuk pilihan tanpa 'Semua' di tengah cukup satu baris
+    lookup. Flag per baris ikut disimpan untuk menghitung pilihan dengan 'Semua' di tengah dari
+    baris terpilih saat dibutuhkan.
+    """
+    ditemukan = (df['keberadaan'] == 'Ditemukan').to_numpy()
+    kepala_keluarga = (df['status_hubungan'] == 'Kepala Keluarga').to_numpy()
+    keluarga, uniques = pd.factorize(df['nama_kepala_keluarga'])
+    
+    order = filter_index['order']
+    counts = {
+        'ditemukan': ditemukan[order].astype(np.int64),
+        'kepala_keluarga': kepala_keluarga[order].astype(np.int64),
+        'kepala_keluarga_ditemukan': (ditemukan & kepala_keluarga)[order].astype(np.int64),
+    }
+    keluarga_sorted = keluarga[order].astype(np.int64)
+    
+    levels = []
+    for nodes in filter_index['nodes']:
+        starts, sizes = nodes['starts'], nodes['ends'] - nodes['starts']
+        summary = pd.DataFrame({'total': sizes.astype(np.int64)})
+        for column in ('ditemukan', 'keluarga', 'kepala_keluarga', 'kepala_keluarga_ditemukan'):
+            if column == 'keluarga':
+                # Jumlah nama kepala keluarga unik per node dari pasangan (node, kode nama) yang unik
+                node_ids = np.repeat(np.arange(len(starts), dtype=np.int64), sizes)
+                named = keluarga_sorted >= 0
+                pairs = np.unique(node_ids[named] * (len(uniques) + 1) + keluarga_sorted[named])
+                summary[column] = np.bincount(pairs // (len(uniques) + 1), minlength=len(starts))
+            else:
+                summary[column] = np.add.reduceat(counts[column], starts) if len(starts) else np.array([], dtype=np.int64)
+        summary['anggota_lain_ditemukan'] = summary['ditemukan'] - summary['kepala_keluarga_ditemukan']
+        levels.append(summary)
+    
+    return {
+        'semua': summarize_art_rows(df),
+        'levels': levels,
+        'ditemukan': ditemukan,
+        'kepala_keluarga': kepala_keluarga,
+        'keluarga': keluarga,
+    }
+
+def lookup_summary(summary_cube, filter_index, selection):
+    """Ringkasan untuk pilihan filter dari kubus (kombinasi tanpa data → semua nol)"""
+    resolved = resolve_filter_selection(filter_index, selection)
+    if resolved is None:
+        return dict.fromkeys(summary_cube['semua'], 0)
+    
+    depth, node, _, _, extra = resolved
+    if not extra:
+        if not depth:
+            return summary_cube['semua']
+        row = summary_cube['levels'][depth - 1].iloc[node]
+        return {column: int(value) for column, value in row.items()}
+    
+    # 'Semua' di level tengah: hitung dari baris di bawah node terdalam yang dipilih
+    positions = _resolved_positions(filter_index, resolved)
+    ditemukan = summary_cube['ditemukan'][positions]
+    kepala_keluarga = summary_cube['kepala_keluarga'][positions]
+    keluarga = summary_cube['keluarga'][positions]
+    kepala_keluarga_ditemukan = int((ditemukan & kepala_keluarga).sum())
+    return {
+        'total': len(positions),
+        'ditemukan': int(ditemukan.sum()),
+        'keluarga': len(np.unique(keluarga[keluarga >= 0])),
+        'kepala_keluarga': int(kepala_keluarga.sum()),
+        'kepala_keluarga_ditemukan': kepala_keluarga_ditemukan,
+        'anggota_lain_ditemukan': int(ditemukan.sum()) - kepala_keluarga_ditemukan,
+    }
+
+def cached_view(key, build):
+    """Mengambil tampilan turunan (DataFrame) dari cache LRU bersama, atau membangunnya dengan build()
+    
+    Cache dibagi antar sesi dan dibatasi VIEW_CACHE_MAX_MB; entri paling lama tidak dipakai dibuang
+    lebih dulu. DataFrame hasil cache dipakai bersama, jadi pemanggil tidak boleh mengubahnya.
+    """
+    cache = _shared_state()['view_cache']
+    with cache['lock']:
+        entry = cache['entries'].get(key)
+        if entry is not None:
+            cache['entries'].move_to_end(key)
+            cache['hits'] += 1
+            return entry[0]
+        cache['misses'] += 1
+    
+    value = build()
+    nbytes = int(value.memory_usage(index=True, deep=True).sum())
+    limit = VIEW_CACHE_MAX_MB * 1024 * 1024
+    if nbytes > limit:
+        return value  # Lebih besar dari batas cache, tidak disimpan
+    
+    with cache['lock']:
+        if key not in cache['entries']:
+            cache['entries'][key] = (value, nbytes)
+            cache['bytes'] += nbytes
+        while cache['bytes'] > limit:
+            _, (_, evicted_bytes) = cache['entries'].popitem(last=False)
+            cache['bytes'] -= evicted_bytes
+            cache['evictions'] += 1
+    return value
+
+def view_cache_stats():
+    """Statistik cache tampilan (hit, miss, eviction, jumlah entri, ukuran)"""
+    cache = _shared_state()['view_cache']
+    with cache['lock']:
+        return {
+            'hits': cache['hits'],
+            'misses': cache['misses'],
+            'evictions': cache['evictions'],
+            'entries': len(cache['entries']),
+            'bytes': cache['bytes'],
+        }
+
+def clear_view_cache():
+    """Mengosongkan cache tampilan (dipakai saat data dimuat ulang)"""
+    cache = _shared_state()['view_cache']
+    with cache['lock']:
+        cache['entries'].clear()
+        cache['bytes'] = 0
+
+def sort_family_members(df):
+    """Mengurutkan anggota keluarga: Kepala Keluarga, Istri, Anak, lainnya; lalu umur tertua lebih dulu"""
+    if len(df) == 0:
+        return df
+    
+    status_map = {
+        'Kepala Keluarga': 1,
+        'Istri': 2,
+        'Anak': 3
+    }
+    status_priority = df['status_hubungan'].astype(object).map(status_map).fillna(4).astype(int)  # Status lain = prioritas 4
+    
+    # Convert umur to numeric untuk sorting, handle empty values
+    umur_sort = pd.to_numeric(df['umur'], errors='coerce').fillna(0)
+    
+    # Sort berdasarkan: 1) status priority (ascending), 2) umur (descending), stabil untuk nilai sama
+    order = np.lexsort((-umur_sort.to_numpy(), status_priority.to_numpy()))
+    return df.iloc[order]
+
+def placeholder_mask(series):
+    """Mask boolean NIK/No. KK pengganti yang diisi petugas jika nomor asli tidak diketahui (mis. 9999999999999998)"""
+    return series.astype(str).str.match(PLACEHOLDER_NIK_PATTERN.pattern)
+
+def _normalize_name(value):
+    """Nama untuk pencarian: huruf besar, hanya huruf/angka, spasi tunggal"""
+    return ' '.join(re.sub(r'[^0-9A-Z]+', ' ', str(value).upper()).split())
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _exact_lookup(values):
+    """Nomor (NIK/No. KK) → posisi baris, tanpa nilai kosong dan placeholder"""
+    values = pd.Series(values, dtype=object).astype(str)
+    valid = (values.str.fullmatch(r'\d+') & ~placeholder_mask(values)).to_numpy()
+    valid_positions = np.nonzero(valid)[0].astype(np.int32)
+    groups = values[valid].groupby(values[valid].to_numpy(), sort=False).indices
+    return {key: valid_positions[positions] for key, positions in groups.items()}
+
+def _csr(keys, values, size):
+    """Mengelompokkan values per key (0..size-1) dalam format CSR: (offsets, values terurut per key)"""
+    order = np.argsort(keys, kind='stable')
+    return np.searchsorted(keys[order], np.arange(size + 1)), values[order]
+
+def search_frame(df_full, df_family=None):
+    """Kolom yang dibutuhkan indeks pencarian (No. KK diambil dari tabel keluarga pada mode tabel ringkas)"""
+    if df_family is not None and '_family_id' in df_full.columns:
+        columns = [column for column in SEARCH_COLUMNS if column in df_full.columns]
+        frame = df_full[columns].copy()
+        frame['nomor_kartu_keluarga'] = df_family['nomor_kartu_keluarga'].reindex(df_full['_family_id'].to_numpy()).to_numpy()
+        return frame[SEARCH_COLUMNS]
+    return df_full[SEARCH_COLUMNS].copy()
+
+def build_search_index(frame):
+    """Membangun indeks pencarian nama/NIK sekali per dataset
+    
+    - NIK dan No. KK: dict nomor → posisi baris untuk lookup persis
+    - Nama (anggota dan kepala keluarga) ternormalisasi: daftar nama dan kata terurut untuk pencarian
+      awalan, dan posting trigram per kata untuk pencarian mirip (variasi ejaan seperti TABUNI/TABUNY)
+    Posisi baris mengacu ke `frame` (urutan sama seperti df_full).
+    """
+    positions = np.arange(len(frame), dtype=np.int32)
+    raw_names = np.concatenate([
+        frame['nama_anggota_keluarga'].astype(object).to_numpy(),
+        frame['nama_kepala_keluarga'].astype(object).to_numpy(),
+    ])
+    raw_positions = np.concatenate([positions, positions])
+    
+    # Normalisasi sekali per nilai unik, lalu petakan ke id nama ternormalisasi
+    raw_codes, raw_uniques = pd.factorize(raw_names)
+    normalized = [_normalize_name(value) for value in raw_uniques]
+    name_codes, names = pd.factorize(np.array(normalized + [''], dtype=object))
+    empty_id = name_codes[-1]
+    row_names = np.where(raw_codes >= 0, name_codes[np.maximum(raw_codes, 0)], empty_id)
+    keep = row_names != empty_id
+    name_offsets, name_rows = _csr(row_names[keep], raw_positions[keep], len(names))
+    names = list(names)
+    
+    # Kata unik → id nama (CSR) dan trigram → id kata
+    word_ids = {}
+    word_keys, word_names = [], []
+    for name_id, name in enumerate(names):
+        for word in set(name.split()):
+            word_keys.append(word_ids.setdefault(word, len(word_ids)))
+            word_names.append(name_id)
+    words = list(word_ids)
+    word_offsets, word_name_ids = _csr(
+        np.array(word_keys, dtype=np.int32), np.array(word_names, dtype=np.int32), len(words)
+    )
+    
+    postings = {}
+    gram_counts = np.zeros(len(words), dtype=np.int32)
+    for word_id, word in enumerate(words):
+        grams = _trigrams(word)
+        gram_counts[word_id] = len(grams)
+        for gram in grams:
+            postings.setdefault(gram, []).append(word_id)
+    
+    sorted_names = sorted((name, name_id) for name_id, name in enumerate(names) if name)
+    sorted_words = sorted((word, word_id) for word_id, word in enumerate(words))
+    
+    return {
+        'frame': frame.reset_index(drop=True),
+        'nik': _exact_lookup(frame['nik'].to_numpy()),
+        'kk': _exact_lookup(frame['nomor_kartu_keluarga'].to_numpy()),
+        'names': names,
+        'name_offsets': name_offsets,
+        'name_rows': name_rows,
+        'sorted_names': [name for name, _ in sorted_names],
+        'sorted_name_ids': np.array([name_id for _, name_id in sorted_names], dtype=np.int32),
+        'words': words,
+        'word_offsets': word_offsets,
+        'word_name_ids': word_name_ids,
+        'sorted_words': [word for word, _ in sorted_words],
+        'sorted_word_ids': np.array([word_id for _, word_id in sorted_words], dtype=np.int32),
+        'postings': {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()},
+        'gram_counts': gram_counts,
+    }
+
+def _prefix_range(sorted_values, prefix):
+    return bisect.bisect_left(sorted_values, prefix), bisect.bisect_left(sorted_values, prefix + '\uffff')
+
+def _word_names(search_index, word_id):
+    offsets = search_index['word_offsets']
+    return search_index['word_name_ids'][offsets[word_id]:offsets[word_id + 1]]
+
+def _similar_word_names(search_index, word):
+    """Id nama → skor kemiripan terbaik untuk satu kata query (Jaccard trigram antar kata)"""
+    grams = _trigrams(word)
+    arrays = [search_index['postings'][gram] for gram in grams if gram in search_index['postings']]
+    if not arrays:
+        return {}
+    
+    hits = np.bincount(np.concatenate(arrays), minlength=len(search_index['words']))
+    candidates = np.nonzero(hits)[0]
+    scores = hits[candidates] / (len(grams) + search_index['gram_counts'][candidates] - hits[candidates])
+    keep = scores >= SEARCH_MIN_SIMILARITY
+    
+    name_scores = {}
+    for word_id, score in zip(candidates[keep], scores[keep]):
+        for name_id in _word_names(search_index, word_id):
+            if score > name_scores.get(name_id, 0):
+                name_scores[name_id] = score
+    return name_scores
+
+def _match_names(search_index, name, limit):
+    """Id nama yang cocok sebagai {id: (jenis, skor)}: awalan nama/kata lebih dulu, lalu kemiripan per kata"""
+    matches = {}
+    
+    start, end = _prefix_range(search_index['sorted_names'], name)
+    for name_id in search_index['sorted_name_ids'][start:min(end, start + limit)]:
+        matches[int(name_id)] = ('Awalan', 1.0)
+    
+    if ' ' not in name:
+        start, end = _prefix_range(search_index['sorted_words'], name)
+        for word_id in search_index['sorted_word_ids'][start:end]:
+            for name_id in _word_names(search_index, word_id):
+                if len(matches) >= limit:
+                    return matches
+                matches.setdefault(int(name_id), ('Awalan', 1.0))
+    
+    if len(matches) < limit:
+        # Setiap kata query harus mirip dengan salah satu kata di nama; skor = rata-rata kemiripan
+        combined = None
+        for word in name.split():
+            word_scores = _similar_word_names(search_index, word)
+            if combined is None:
+                combined = word_scores
+            else:
+                combined = {name_id: combined[name_id] + score for name_id, score in word_scores.items() if name_id in combined}
+        word_count = len(name.split())
+        ranked = sorted(combined.items(), key=lambda item: -item[1])
+        for name_id, score in ranked:
+            if len(matches) >= limit:
+                break
+            matches.setdefault(int(name_id), ('Mirip', round(float(score) / word_count, 2)))
+    
+    return matches
+
+def search_art(search_index, query, limit=SEARCH_LIMIT):
+    """Mencari ART berdasarkan NIK/No. KK (persis) atau nama (awalan dan mirip)
+    
+    Mengembalikan DataFrame baris yang cocok (kolom SEARCH_COLUMNS + 'cocok' + 'skor'), paling relevan dulu.
+    """
+    text = str(query).strip()
+    compact = text.replace(' ', '')
+    results = []
+    
+    if compact.isdigit():
+        results += [(position, 'NIK', 1.0) for position in search_index['nik'].get(compact, [])]
+        results += [(position, 'No. KK', 1.0) for position in search_index['kk'].get(compact, [])]
+    else:
+        name = _normalize_name(text)
+        if name:
+            offsets, name_rows = search_index['name_offsets'], search_index['name_rows']
+            seen = set()
+            for name_id, (match, score) in _match_names(search_index, name, limit).items():
+                for position in name_rows[offsets[name_id]:offsets[name_id + 1]]:
+                    if position not in seen:
+                        seen.add(position)
+                        results.append((int(position), match, score))
+            results.sort(key=lambda result: -result[2])
+    
+    results = results[:limit]
+    frame = search_index['frame'].iloc[[position for position, _, _ in results]].copy()
+    frame['cocok'] = [match for _, match, _ in results]
+    frame['skor'] = [score for _, _, score in results]
+    return frame
+
+def build_quality_report(df_full, df_family=None, records=None):
+    """Laporan kualitas data: semua pemeriksaan dihitung per kolom, lalu dijumlahkan per kecamatan/desa dalam satu groupby
+    
+    records: DataFrame 'id' dan 'status' record gabungan per baris df_full (urutan sama); satu record = satu
+    keluarga. Tanpa records, keluarga diambil dari kolom lokasi/keluarga dan status record tidak diperiksa.
+    Menghasilkan 'ringkasan' (jumlah temuan per kecamatan/desa; pemeriksaan keluarga dihitung per keluarga)
+    dan 'temuan' (baris ART yang terkena minimal satu pemeriksaan, dengan kolom 'masalah').
+    """
+    if records is not None:
+        family_id = pd.factorize(records['id'].to_numpy())[0]
+        record_failed = (records['status'] != 'success').to_numpy()
+    elif df_family is not None:
+        family_id = pd.factorize(df_full['_family_id'].to_numpy())[0]
+        record_failed = np.zeros(len(df_full), dtype=bool)
+    else:
+        family_id = df_full.groupby(LOCATION_COLUMNS + FAMILY_COLUMNS, sort=False, dropna=False).ngroup().to_numpy()
+        record_failed = np.zeros(len(df_full), dtype=bool)
+    
+    family_columns = df_family.reindex(df_full['_family_id'].to_numpy()) if df_family is not None else df_full
+    jumlah_anggota = pd.to_numeric(family_columns['jumlah_anggota_keluarga'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    
+    # Baris tanpa ART (record tanpa art_details) tidak dihitung sebagai anggota
+    is_art = (
+        pd.to_numeric(df_full['nomor_urut_anggota_keluarga'], errors='coerce').notna()
+        | (df_full['nama_anggota_keluarga'].astype(str) != '')
+    ).to_numpy()
+    jumlah_art = np.bincount(family_id, weights=is_art, minlength=1)[family_id].astype(int)
+    first_of_family = ~pd.Series(family_id).duplicated().to_numpy()
+    
+    nik = _join_number(df_full['nik'])
+    placeholder_nik = placeholder_mask(nik).to_numpy()
+    valid_nik = (nik != '').to_numpy() & ~placeholder_nik
+    nik_families = pd.DataFrame({'nik': nik.to_numpy(), 'family': family_id})[valid_nik].drop_duplicates()['nik'].value_counts()
+    
+    flags = {
+        'jumlah_anggota_tidak_sesuai': ~np.isnan(jumlah_anggota) & (jumlah_anggota != jumlah_art),
+        'nik_di_banyak_keluarga': valid_nik & (nik.map(nik_families).fillna(0).to_numpy() > 1),
+        'nik_placeholder': placeholder_nik,
+        'umur_kosong': is_art & pd.to_numeric(df_full['umur'], errors='coerce').isna().to_numpy(),
+        'record_gagal': record_failed,
+    }
+    
+    counts = pd.DataFrame({
+        'kecamatan': df_full['kecamatan'].to_numpy(),
+        'desa_kelurahan': df_full['desa_kelurahan'].to_numpy(),
+        'jumlah_keluarga': first_of_family,
+        'jumlah_art': is_art,
+    })
+    for check, flag in flags.items():
+        counts[check] = flag & first_of_family if check in QUALITY_FAMILY_CHECKS else flag
+    summary = counts.groupby(['kecamatan', 'desa_kelurahan'], sort=True, dropna=False, observed=True).sum().reset_index()
+    
+    positions = np.nonzero(np.logical_or.reduce(list(flags.values())))[0]
+    masalah = pd.Series('', index=positions, dtype=object)
+    for check, flag in flags.items():
+        hit = flag[positions]
+        masalah[hit] = masalah[hit] + f"{QUALITY_CHECKS[check]}; "
+    
+    expanded = expand_art_table(df_full.iloc[positions], df_family) if df_family is not None else df_full.iloc[positions]
+    findings = expanded[QUALITY_FINDING_COLUMNS].reset_index(drop=True)
+    findings.insert(QUALITY_FINDING_COLUMNS.index('jumlah_anggota_keluarga') + 1, 'jumlah_art', jumlah_art[positions])
+    findings['masalah'] = masalah.str.rstrip('; ').to_numpy()
+    
+    return {'ringkasan': summary, 'temuan': findings}
+
+def prepare_dataset(dataset):
+    """Melengkapi bundle dataset dengan struktur turunan (indeks filter, kubus ringkasan) yang dibangun sekali per dataset
+    
+    Indeks pencarian tidak dibangun di sini (paling mahal), tetapi saat pencarian pertama lewat dataset_search_index.
+    """
+    if dataset is not None and dataset['df_full'] is not None:
+        with profile_stage('indeks_filter', len(dataset['df_full'])) as stage:
+            dataset['filter_index'] = build_filter_index(dataset['df_full'])
+            stage['rows_out'] = sum(len(nodes['keys']) for nodes in dataset['filter_index']['nodes'])
+        with profile_stage('kubus_ringkasan', len(dataset['df_full'])) as stage:
+            dataset['summary_cube'] = build_summary_cube(dataset['df_full'], dataset['filter_index'])
+            stage['rows_out'] = sum(len(summary) for summary in dataset['summary_cube']['levels'])
+        dataset['search_index'] = None
+    return dataset
+
+def dataset_search_index(dataset):
+    """Indeks pencarian dataset, dibangun sekali saat pertama dibutuhkan lalu disimpan di bundle (dibagi antar sesi)"""
+    if dataset['search_index'] is None:
+        with _shared_state()['search_index_lock']:
+            if dataset['search_index'] is None:
+                with profile_stage('indeks_pencarian', len(dataset['df_full'])) as stage:
+                    dataset['search_index'] = build_search_index(search_frame(dataset['df_full'], dataset['df_family']))
+                    stage['rows_out'] = len(dataset['search_index']['names'])
+    return dataset['search_index']
+
+def build_supas_dataset(manifest):
+    """Membaca dan memproses file sesuai manifest menjadi bundle dataset (tanpa cache)"""
+    files = [file_path for file_path, _, _ in manifest]
+    try:
+        arts_data, message = sync_merge_index(files)
+    except sqlite3.Error as e:
+        # Indeks tidak bisa dipakai (mis. folder read-only), baca ulang semua file
+        st.warning(f"Indeks gabungan tidak tersedia, membaca ulang semua file: {str(e)}")
+        with profile_stage('baca_semua_file', len(files)) as stage:
+            arts_data, message = load_art_rows(files)
+            stage['rows_out'] = len(arts_data) if arts_data is not None else 0
+    
+    return dataset_from_art_rows(arts_data, message)
+
+def dataset_from_art_rows(arts_data, message, source='build'):
+    """Bundle dataset dari baris ART mentah hasil dedup (df_full None jika tidak ada baris)"""
+    dataset = {'df_full': None, 'df_family': None, 'message': message, 'source': source}
+    
+    if arts_data:
+        df_full = process_art_rows(arts_data)
+        if COMPACT_TABLE:
+            with profile_stage('tabel_ringkas', len(df_full)) as stage:
+                df_full, dataset['df_family'] = compact_art_table(df_full)
+                stage['rows_out'] = len(df_full)
+        dataset['df_full'] = df_full
+        
+        # ID/status record hanya ada di langkah gabung; index df_full = posisi baris di arts_data
+        with profile_stage('laporan_kualitas', len(df_full)) as stage:
+            records = pd.DataFrame(
+                [(row.get('_id_record', ''), row.get('_status_record', '')) for row in arts_data], columns=['id', 'status']
+            ).iloc[df_full.index.to_numpy()]
+            dataset['quality_report'] = build_quality_report(df_full, dataset['df_family'], records)
+            stage['rows_out'] = len(dataset['quality_report']['temuan'])
+    
+    dataset['built_at'] = dataset['loaded_at'] = datetime.now()
+    return dataset
+
+def snapshot_tag(manifest):
+    """Tag snapshot: hash dari versi kode/skema dan manifest file input"""
+    payload = json.dumps([SNAPSHOT_VERSION, MERGE_INDEX_VERSION, list(manifest)])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def save_dataset_snapshot(dataset, manifest, snapshot_dir=SNAPSHOT_DIR):
+    """Menyimpan df_full (dan tabel keluarga) sebagai Parquet di folder bertag, lalu menghapus snapshot lama
+    
+    Folder ditulis dengan nama sementara lalu di-rename, sehingga pembaca tidak pernah melihat snapshot setengah jadi.
+    """
+    if not SNAPSHOT_ENABLED or dataset['df_full'] is None:
+        return None
+    
+    tag = snapshot_tag(manifest)
+    target_dir = os.path.join(snapshot_dir, tag)
+    temp_dir = f"{target_dir}.tmp-{os.getpid()}-{threading.get_ident()}"
+    os.makedirs(temp_dir, exist_ok=True)
+    
+    try:
+        dataset['df_full'].to_parquet(os.path.join(temp_dir, 'art.parquet'))
+        dataset['df_family'].to_parquet(os.path.join(temp_dir, 'family.parquet'))
+        for name, df_report in dataset['quality_report'].items():
+            df_report.to_parquet(os.path.join(temp_dir, f'kualitas_{name}.parquet'))
+        with open(os.path.join(temp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'tag': tag,
+                'version': SNAPSHOT_VERSION,
+                'manifest': list(manifest),
+                'message': dataset['message'],
+                'built_at': dataset['built_at'].isoformat(),
+            }, f, ensure_ascii=False)
+        
+        with _shared_state()['snapshot_lock']:
+            if os.path.isdir(target_dir):
+                shutil.rmtree(temp_dir)
+            else:
+                os.rename(temp_dir, target_dir)
+            
+            # Simpan hanya snapshot terbaru
+            for name in os.listdir(snapshot_dir):
+                if name != tag and '.tmp-' not in name:
+                    shutil.rmtree(os.path.join(snapshot_dir, name), ignore_errors=True)
+    except Exception:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    
+    return tag
+
+def _snapshot_version(target_dir):
+    """Versi snapshot dari meta.json, None jika tidak ada atau tidak terbaca"""
+    try:
+        with open(os.path.join(target_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+            return json.load(f).get('version')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def latest_snapshot_tag(snapshot_dir=SNAPSHOT_DIR):
+    """Tag snapshot versi saat ini yang tersedia di disk (paling baru), None jika belum ada
+    
+    Snapshot dengan SNAPSHOT_VERSION lain diabaikan karena load_dataset_snapshot tidak bisa memuatnya.
+    """
+    if not SNAPSHOT_ENABLED or not os.path.isdir(snapshot_dir):
+        return None
+    
+    tags = [
+        name for name in os.listdir(snapshot_dir)
+        if '.tmp-' not in name and _snapshot_version(os.path.join(snapshot_dir, name)) == SNAPSHOT_VERSION
+    ]
+    if not tags:
+        return None
+    return max(tags, key=lambda name: os.path.getmtime(os.path.join(snapshot_dir, name)))
+
+def load_dataset_snapshot(tag, snapshot_dir=SNAPSHOT_DIR):
+    """Memuat bundle dataset dari snapshot bertag, None jika tidak ada atau rusak"""
+    target_dir = os.path.join(snapshot_dir, tag)
+    try:
+        with open(os.path.join(target_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != SNAPSHOT_VERSION:
+            return None
+        
+        with profile_stage('muat_snapshot') as stage:
+            df_full = pd.read_parquet(os.path.join(target_dir, 'art.parquet'))
+            df_family = pd.read_parquet(os.path.join(target_dir, 'family.parquet'))
+            quality_report = {
+                name: pd.read_parquet(os.path.join(target_dir, f'kualitas_{name}.parquet'))
+                for name in ('ringkasan', 'temuan')
+            }
+            stage['rows_out'] = len(df_full)
+        
+        return {
+            'df_full': df_full,
+            'df_family': df_family,
+            'quality_report': quality_report,
+            'message': meta['message'],
+            'source': 'snapshot',
+            'built_at': datetime.fromisoformat(meta['built_at']),
+            'loaded_at': datetime.now(),
+        }
+    except Exception:
+        return None
+
+def _rebuild_snapshot(manifest):
+    """Dijalankan di thread latar belakang: membangun ulang dataset lalu menyimpan snapshot baru"""
+    state = _shared_state()
+    try:
+        save_dataset_snapshot(build_supas_dataset(manifest), manifest)
+    except Exception as e:
+        state['snapshot_rebuild']['error'] = str(e)
+    finally:
+        state['snapshot_rebuild']['done'] = True
+
+def start_snapshot_rebuild(manifest):
+    """Memulai pembangunan ulang snapshot di latar belakang (sekali per manifest)"""
+    state = _shared_state()
+    tag = snapshot_tag(manifest)
+    
+    with state['snapshot_lock']:
+        rebuild = state['snapshot_rebuild']
+        if rebuild is not None and rebuild['tag'] == tag and (not rebuild['done'] or rebuild['error'] is None):
+            return rebuild
+        
+        rebuild = {'tag': tag, 'done': False, 'error': None, 'started_at': datetime.now()}
+        state['snapshot_rebuild'] = rebuild
+        threading.Thread(target=_rebuild_snapshot, args=(manifest,), daemon=True).start()
+    
+    return rebuild
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_supas_dataset(manifest):
+    """Memuat dataset sesuai manifest: dari snapshot jika tag cocok, selain itu dibangun ulang (dan disimpan sebagai snapshot)
+    
+    Hasil disimpan sekali per proses server (dibagi antar sesi, tidak disalin) selama manifest tidak
+    berubah; isinya tidak boleh diubah oleh pemanggil.
+    """
+    tag = snapshot_tag(manifest)
+    if SNAPSHOT_ENABLED and latest_snapshot_tag() == tag:
+        dataset = load_dataset_snapshot(tag)
+        if dataset is not None:
+            return prepare_dataset(dataset)
+    
+    dataset = build_supas_dataset(manifest)
+    try:
+        save_dataset_snapshot(dataset, manifest)
+    except Exception as e:
+        st.warning(f"Snapshot tidak bisa disimpan: {str(e)}")
+    return prepare_dataset(dataset)
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_stale_snapshot(tag):
+    """Memuat snapshot lama (tag tidak cocok) untuk ditampilkan selama snapshot baru dibangun
+    
+    Snapshot yang tidak bisa dimuat menjadi ValueError (bukan None) agar kegagalannya tidak ikut di-cache.
+    """
+    dataset = load_dataset_snapshot(tag)
+    if dataset is None:
+        raise ValueError(f"Snapshot {tag} tidak bisa dimuat")
+    return prepare_dataset(dataset)
+
+def merge_file_newest_first(merged, rank, entries):
+    """Menggabungkan entri satu file ke merged, dengan file diproses dari yang terbaru (rank terbesar) ke terlama
+    
+    Hasil akhirnya sama seperti read_all_supas_files yang membaca file dari yang terlama: record file
+    lama hanya kalah jika record yang lebih baru lebih diutamakan (is_preferred_record), dan posisi
+    record mengikuti kemunculan pertamanya (rank, urutan di file).
+    """
+    file_records = {}
+    for position, (record_id, status, timestamp, rows) in enumerate(entries):
+        record = file_records.get(record_id)
+        if record is None:
+            file_records[record_id] = (status, timestamp, rows, (rank, position))
+        elif is_preferred_record(status, timestamp, record[0], record[1]):
+            file_records[record_id] = (status, timestamp, rows, record[3])
+    
+    for record_id, record in file_records.items():
+        newer = merged.get(record_id)
+        if newer is not None and is_preferred_record(newer[0], newer[1], record[0], record[1]):
+            record = (*newer[:3], record[3])
+        merged[record_id] = record
+
+def merged_art_rows(merged):
+    """Baris ART mentah dari merge_file_newest_first, urut seperti hasil read_all_supas_files"""
+    return [row for *_, rows, _ in sorted(merged.values(), key=lambda record: record[3]) for row in rows]
+
+def _run_progressive_load(load, manifest):
+    """Dijalankan di thread latar belakang: membaca file dari yang terbaru dan menerbitkan dataset sementara"""
+    state = _shared_state()
+    files = [file_path for file_path, _, _ in manifest]
+    ranks = list(range(len(files) - 1, -1, -1))
+    merged = {}
+    published_records = 0
+    
+    try:
+        flattened = flatten_supas_files([files[rank] for rank in ranks])
+        for rank, (file_path, entries, error) in zip(ranks, flattened):
+            with profile_stage('baca_file_progresif', len(entries)) as stage:
+                merge_file_newest_first(merged, rank, entries)
+                stage['rows_out'] = len(merged)
+            if error:
+                load['errors'].append(f"Error reading {file_path}: {error}")
+            load['files_done'] += 1
+            load['bytes_done'] += manifest[rank][1]
+            load['records'] = len(merged)
+            
+            # Terbitkan dataset sementara di batch pertama lalu setiap jumlah record bertambah PROGRESSIVE_GROWTH kali
+            if rank > 0 and (not merged or len(merged) < published_records * PROGRESSIVE_GROWTH):
+                continue
+            
+            message = f"Berhasil membaca {load['files_done']} file dan menggabungkan {len(merged)} record unik"
+            dataset = prepare_dataset(dataset_from_art_rows(merged_art_rows(merged), message, source='progressive'))
+            published_records = len(merged)
+            with state['progressive_lock']:
+                load['dataset'] = dataset
+                load['version'] += 1
+                load['done'] = rank == 0
+        
+        if dataset['df_full'] is not None:
+            try:
+                save_dataset_snapshot(dataset, manifest)
+            except Exception as e:
+                load['errors'].append(f"Snapshot tidak bisa disimpan: {str(e)}")
+    except Exception as e:
+        with state['progressive_lock']:
+            load['error'] = str(e)
+            load['done'] = True
+
+def start_progressive_load(manifest):
+    """Memulai pemuatan progresif di latar belakang (sekali per manifest, kecuali yang sebelumnya gagal)"""
+    state = _shared_state()
+    tag = snapshot_tag(manifest)
+    
+    with state['progressive_lock']:
+        load = state['progressive_load']
+        if load is not None and load['tag'] == tag and load['error'] is None:
+            return load
+        
+        load = {
+            'tag': tag, 'files_total': len(manifest), 'files_done': 0,
+            'bytes_total': sum(size for _, size, _ in manifest), 'bytes_done': 0, 'records': 0,
+            'dataset': None, 'version': 0, 'done': False, 'error': None, 'errors': [],
+            'started_at': datetime.now(),
+        }
+        state['progressive_load'] = load
+        threading.Thread(target=_run_progressive_load, args=(load, manifest), daemon=True).start()
+    
+    return load
+
+def get_progressive_load(manifest):
+    """Salinan status pemuatan progresif untuk manifest ini (dataset dan versinya konsisten), None jika belum ada"""
+    state = _shared_state()
+    with state['progressive_lock']:
+        load = state['progressive_load']
+        if load is None or load['tag'] != snapshot_tag(manifest):
+            return None
+        return dict(load, errors=list(load['errors']))
+
+def clear_progressive_load():
+    """Melupakan pemuatan progresif (dipakai saat data dimuat ulang)"""
+    state = _shared_state()
+    with state['progressive_lock']:
+        state['progressive_load'] = None
+
+@st.fragment(run_every=PROGRESSIVE_POLL_SECONDS)
+def show_progressive_load_progress(manifest, version):
+    """Progress pemuatan progresif; seluruh halaman di-rerun saat dataset yang lebih lengkap tersedia"""
+    load = get_progressive_load(manifest)
+    if load is None or load['version'] != version or load['done']:
+        st.rerun()
+    
+    files_left = load['files_total'] - load['files_done']
+    mb_left = (load['bytes_total'] - load['bytes_done']) / 1024 / 1024
+    st.progress(
+        load['files_done'] / max(load['files_total'], 1),
+        text=(
+            f"⏳ Memuat file SUPAS dari yang terbaru: {load['files_done']}/{load['files_total']} file, "
+            f"{load['records']} record unik · sisa {files_left} file ({mb_left:.1f} MB)"
+        )
+    )
+
+def choose_query_backend(manifest):
+    """Menentukan backend query: pandas untuk folder kecil, SQLite untuk folder besar (atau sesuai SUPAS_BACKEND)"""
+    if QUERY_BACKEND in ('pandas', 'sqlite'):
+        return QUERY_BACKEND
+    total_size = sum(size for _, size, _ in manifest)
+    return 'sqlite' if total_size >= SQL_BACKEND_MIN_BYTES else 'pandas'
+
+def _art_db_meta(db_path):
+    """Membaca tabel meta database ART, None jika database belum ada atau tidak valid"""
+    if not os.path.exists(db_path):
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            return dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+
+def build_art_database(manifest, db_path=ART_DB_PATH):
+    """Memuat baris ART final ke database SQLite terindeks (ditulis ke file sementara lalu di-rename)"""
+    tag = snapshot_tag(manifest)
+    dataset = load_dataset_snapshot(tag) if SNAPSHOT_ENABLED and latest_snapshot_tag() == tag else None
+    if dataset is None:
+        dataset = build_supas_dataset(manifest)
+    if dataset['df_full'] is None:
+        return None
+    
+    message = dataset['message']
+    quality_report = dataset['quality_report']
+    df = expand_art_table(dataset['df_full'], dataset['df_family']).reset_index(drop=True)
+    df.insert(0, '_row', np.arange(len(df)))
+    del dataset
+    
+    temp_path = f"{db_path}.tmp-{os.getpid()}"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    
+    conn = sqlite3.connect(temp_path)
+    try:
+        # NUMERIC agar angka tetap angka dan '' tetap teks (mode tabel non-ringkas)
+        numeric_columns = {column: 'NUMERIC' for column in ('umur', 'lulus_sd', 'lulus_smp', 'lulus_sma')}
+        df.to_sql('art', conn, index=False, chunksize=10000, dtype=numeric_columns)
+        for column in ART_DB_INDEXED_COLUMNS:
+            conn.execute(f"CREATE INDEX idx_art_{column} ON art ({column})")
+        conn.execute(f"CREATE INDEX idx_art_hierarchy ON art ({', '.join(FILTER_LEVELS)})")
+        for name, df_report in quality_report.items():
+            df_report.to_sql(f'kualitas_{name}', conn, index=False, chunksize=10000)
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+            ('tag', tag),
+            ('message', message),
+            ('total_rows', str(len(df))),
+        ])
+        conn.commit()
+    finally:
+        conn.close()
+    
+    os.replace(temp_path, db_path)
+    return {'path': db_path, 'tag': tag, 'total_rows': len(df)}
+
+def invalidate_saved_data(snapshot_dir=SNAPSHOT_DIR, index_path=MERGE_INDEX_PATH, db_path=ART_DB_PATH):
+    """Membuang snapshot, indeks gabungan dan database ART di disk agar data berikutnya dibangun ulang dari file SUPAS"""
+    state = _shared_state()
+    with state['snapshot_lock']:
+        state['snapshot_rebuild'] = None
+        if os.path.isdir(snapshot_dir):
+            for name in os.listdir(snapshot_dir):
+                if '.tmp-' not in name:
+                    shutil.rmtree(os.path.join(snapshot_dir, name), ignore_errors=True)
+    
+    if os.path.exists(index_path):
+        with state['merge_index_lock']:
+            conn = _open_merge_index(index_path)
+            try:
+                _reset_merge_index(conn)
+            finally:
+                conn.close()
+    
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def get_art_database(manifest, db_path=ART_DB_PATH):
+    """Database ART untuk manifest ini; dibangun ulang hanya jika tag manifest berubah (sekali per proses server)"""
+    tag = snapshot_tag(manifest)
+    meta = _art_db_meta(db_path)
+    if meta is None or meta.get('tag') != tag:
+        if build_art_database(manifest, db_path) is None:
+            return None
+        meta = _art_db_meta(db_path)
+    
+    return {
+        'path': db_path,
+        'message': meta.get('message', ''),
+        'total_rows': int(meta.get('total_rows', 0)),
+        'tag': meta.get('tag'),
+    }
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def get_sql_search_index(db_path, tag):
+    """Indeks pencarian untuk backend SQLite: hanya kolom pencarian yang dimuat dari database"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        frame = pd.read_sql_query(f"SELECT {', '.join(SEARCH_COLUMNS)} FROM art ORDER BY _row", conn)
+    finally:
+        conn.close()
+    return build_search_index(frame)
+
+def _selection_where(selection):
+    """Klausa WHERE dan parameter untuk pilihan filter (level 'Semua' diabaikan)"""
+    conditions, params = [], []
+    for level, value in zip(FILTER_LEVELS, selection):
+        if value != FILTER_ALL:
+            conditions.append(f"{level} = ?")
+            params.append(value)
+    return (" WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+def _query_art_db(db_path, sql, params=()):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+def query_filter_options(db_path, prefix):
+    """Opsi selectbox level berikutnya lewat query terindeks (urutan sama seperti filter_options)"""
+    level = FILTER_LEVELS[len(prefix)]
+    where, params = _selection_where(prefix)
+    where += (" AND " if where else " WHERE ") + f"{level} IS NOT NULL AND {level} != '' AND {level} != 'nan'"
+    values = [value for (value,) in _query_art_db(db_path, f"SELECT DISTINCT {level} FROM art{where}", params)]
+    return [FILTER_ALL] + sorted(str(value) for value in values)
+
+def query_summary(db_path, selection):
+    """Ringkasan angka (sama seperti summarize_art_rows) lewat satu query agregat"""
+    where, params = _selection_where(selection)
+    total, ditemukan, keluarga, kepala_keluarga, kepala_keluarga_ditemukan = _query_art_db(db_path, f"""
+        SELECT COUNT(*),
+               COALESCE(SUM(keberadaan = 'Ditemukan'), 0),
+               COUNT(DISTINCT nama_kepala_keluarga),
+               COALESCE(SUM(status_hubungan = 'Kepala Keluarga'), 0),
+               COALESCE(SUM(keberadaan = 'Ditemukan' AND status_hubungan = 'Kepala Keluarga'), 0)
+        FROM art{where}
+    """, params)[0]
+    return {
+        'total': total,
+        'ditemukan': ditemukan,
+        'keluarga': keluarga,
+        'kepala_keluarga': kepala_keluarga,
+        'kepala_keluarga_ditemukan': kepala_keluarga_ditemukan,
+        'anggota_lain_ditemukan': ditemukan - kepala_keluarga_ditemukan,
+    }
+
+def query_art_rows(db_path, selection, keberadaan=None):
+    """Mengambil hanya baris yang dibutuhkan (urutan sama seperti df_full) sebagai DataFrame"""
+    where, params = _selection_where(selection)
+    if keberadaan is not None:
+        where += (" AND " if where else " WHERE ") + "keberadaan = ?"
+        params.append(keberadaan)
+    
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        df = pd.read_sql_query(f"SELECT * FROM art{where} ORDER BY _row", conn, params=params)
+    finally:
+        conn.close()
+    
+    # Urutan baris di df_full dipakai sebagai index
+    df = df.set_index('_row').rename_axis(None)
+    if COMPACT_TABLE:
+        df = _compact_columns(df)
+    return df
+
+def find_reference_files(pattern=REFERENCE_FILE_PATTERN):
+    """Mencari file referensi datar per ART (data_*.json), diurutkan berdasarkan nama file"""
+    return sorted(glob.glob(pattern))
+
+def read_reference_files(files):
+    """Membaca file referensi (list ART datar) menjadi satu DataFrame teks
+    
+    Nama kolom yang hanya beda huruf besar/kecil dengan kolom ekstraksi (mis. Lulus_SD) disamakan,
+    dan asal setiap baris dicatat di kolom sumber_referensi.
+    """
+    if not files:
+        return None, "Tidak ditemukan file referensi data_*.json di folder ini"
+    
+    frames = []
+    for file_path in files:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                rows = json.load(f)
+            if not isinstance(rows, list):
+                raise ValueError("isi file bukan list ART")
+        except (OSError, ValueError) as e:
+            st.warning(f"Error reading {file_path}: {str(e)}")
+            continue
+        
+        df = pd.DataFrame(rows)
+        df.columns = [column.lower() if column.lower() in ART_COLUMNS else column for column in df.columns]
+        df = df.fillna('').astype(str)
+        df['sumber_referensi'] = os.path.basename(file_path)
+        frames.append(df)
+    
+    if not frames:
+        return None, "Tidak ada file referensi yang bisa dibaca"
+    
+    df_ref = pd.concat(frames, ignore_index=True, sort=False).fillna('')
+    return df_ref, f"Berhasil membaca {len(frames)} file referensi ({len(df_ref)} baris ART)"
+
+def reference_extra_columns(df_ref):
+    """Kolom referensi yang tidak ada di hasil ekstraksi (mis. gaji_uang, jam_kerja, Pendidikan)"""
+    return [column for column in df_ref.columns if column not in ART_COLUMNS and column != 'sumber_referensi']
+
+def _join_number(series, strip_zeros=False):
+    """Nomor sebagai teks digit untuk kunci join; nilai lain (kosong, <NA>, 9.1021E+15) menjadi ''
+    
+    Dengan strip_zeros=True nol di depan dibuang (No. urut '01' dan NKS '00785' di satu sisi, '1'/'785' di sisi lain).
+    """
+    values = series.astype(str).str.strip()
+    values = values.where(values.str.fullmatch(r'\d+'), '')
+    if strip_zeros:
+        stripped = values.str.lstrip('0')
+        values = stripped.where((stripped != '') | (values == ''), '0')
+    return values
+
+def reconciliation_keys(df):
+    """Kunci join per baris: (NIK, No. KK|No. urut anggota); '' berarti baris tidak ikut pass tersebut
+    
+    NIK placeholder tidak dipakai. No. KK placeholder juga dipakai banyak keluarga, sehingga untuk
+    No. KK seperti itu kunci pass kedua ditambah NKS dan nama anggota agar tidak ambigu.
+    """
+    nik = _join_number(df['nik'])
+    nik = nik.where(~placeholder_mask(nik), '')
+    
+    kk = _join_number(df['nomor_kartu_keluarga'])
+    urut = _join_number(df['nomor_urut_anggota_keluarga'], strip_zeros=True)
+    member = (kk + '|' + urut).where((kk != '') & (urut != ''), '')
+    
+    placeholder_kk = placeholder_mask(kk).to_numpy()
+    if placeholder_kk.any():
+        # Nama dinormalisasi sekali per nilai unik, hanya untuk baris dengan No. KK placeholder
+        subset = df[placeholder_kk]
+        codes, uniques = pd.factorize(subset['nama_anggota_keluarga'].astype(str))
+        name = pd.Series(np.array([_normalize_name(value) for value in uniques], dtype=object)[codes], index=subset.index)
+        nks = _join_number(subset['nks'], strip_zeros=True)
+        member[placeholder_kk] = (member[placeholder_kk] + '|' + nks + '|' + name).where(name != '', '')
+    
+    return nik.reset_index(drop=True), member.reset_index(drop=True)
+
+def _hash_join(left_keys, right_keys):
+    """Hash join satu-ke-satu antara dua Series kunci (index = posisi baris)
+    
+    Kunci kosong dan kunci yang muncul lebih dari sekali di salah satu sisi (ambigu) tidak dipasangkan.
+    Mengembalikan array posisi kiri dan kanan yang cocok.
+    """
+    left_keys = left_keys[(left_keys != '') & ~left_keys.duplicated(keep=False)]
+    right_keys = right_keys[(right_keys != '') & ~right_keys.duplicated(keep=False)]
+    matched = pd.merge(
+        pd.DataFrame({'key': left_keys.to_numpy(), 'left': left_keys.index.to_numpy()}),
+        pd.DataFrame({'key': right_keys.to_numpy(), 'right': right_keys.index.to_numpy()}),
+        on='key', how='inner', validate='one_to_one'
+    )
+    return matched['left'].to_numpy(), matched['right'].to_numpy()
+
+def reconcile_reference(df_art, df_ref):
+    """Mencocokkan baris ART ekstraksi dengan data referensi dalam dua pass hash join
+    
+    Pass 1 memakai NIK; pass 2 memakai No. KK + No. urut anggota, hanya di antara baris yang belum
+    cocok. Hasil: 'enriched' (baris ART yang cocok + kolom tambahan referensi, sumber_referensi dan
+    kunci_join), 'unmatched_art', 'unmatched_reference' dan jumlah kecocokan per kunci ('matched_by').
+    """
+    art_keys = reconciliation_keys(df_art)
+    ref_keys = reconciliation_keys(df_ref)
+    art_open = np.ones(len(df_art), dtype=bool)
+    ref_open = np.ones(len(df_ref), dtype=bool)
+    
+    art_positions, ref_positions, join_keys, matched_by = [], [], [], {}
+    for key_name, art_key, ref_key in zip(('nik', 'kk_urut'), art_keys, ref_keys):
+        art_matched, ref_matched = _hash_join(art_key[art_open], ref_key[ref_open])
+        art_open[art_matched] = False
+        ref_open[ref_matched] = False
+        art_positions.append(art_matched)
+        ref_positions.append(ref_matched)
+        join_keys.append(np.full(len(art_matched), key_name, dtype=object))
+        matched_by[key_name] = len(art_matched)
+    
+    # Baris hasil mengikuti urutan df_art
+    art_positions = np.concatenate(art_positions)
+    order = np.argsort(art_positions, kind='stable')
+    art_positions = art_positions[order]
+    ref_positions = np.concatenate(ref_positions)[order]
+    
+    extra_columns = reference_extra_columns(df_ref) + ['sumber_referensi']
+    enriched = df_art.iloc[art_positions].reset_index(drop=True)
+    for column in extra_columns:
+        enriched[column] = df_ref[column].to_numpy()[ref_positions]
+    enriched['kunci_join'] = np.concatenate(join_keys)[order]
+    
+    return {
+        'enriched': enriched,
+        'unmatched_art': df_art.iloc[np.nonzero(art_open)[0]],
+        'unmatched_reference': df_ref.iloc[np.nonzero(ref_open)[0]],
+        'matched_by': matched_by,
+    }
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def get_reconciliation(view_key, reference_manifest, _load_art):
+    """Hasil rekonsiliasi untuk dataset yang ditampilkan dan file referensi saat ini (sekali per proses server)
+    
+    _load_art() mengembalikan baris ART lengkap; tidak ikut di-hash, perubahan data tercermin lewat view_key.
+    """
+    df_ref, message = read_reference_files([file_path for file_path, _, _ in reference_manifest])
+    if df_ref is None:
+        return None, message
+    
+    df_art = _load_art()
+    with profile_stage('rekonsiliasi', len(df_art) + len(df_ref)) as stage:
+        result = reconcile_reference(df_art, df_ref)
+        stage['rows_out'] = len(result['enriched'])
+    return result, message
+
+def query_quality_report(db_path):
+    """Laporan kualitas data yang disimpan bersama database ART (bentuk sama seperti build_quality_report)"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return {name: pd.read_sql_query(f"SELECT * FROM kualitas_{name}", conn) for name in ('ringkasan', 'temuan')}
+    finally:
+        conn.close()
+
+def build_export_filename(provinsi, kecamatan, desa, timestamp, extension='xlsx'):
+    """Nama file export: supas_art_data_<filter>_<timestamp>.<ext> (filter 'Semua' tidak dicantumkan)"""
+    filter_info = ""
+    if provinsi != FILTER_ALL:
+        filter_info += f"_{provinsi.replace(' ', '_')}"
+    if kecamatan != FILTER_ALL:
+        filter_info += f"_{kecamatan.replace(' ', '_')}"
+    if desa != FILTER_ALL:
+        filter_info += f"_{desa.replace(' ', '_')}"
+    
+    return f"supas_art_data{filter_info}_{timestamp}.{extension}"
+
+def write_excel_file(df, path):
+    """Worker CLI: menulis satu partisi ke file Excel dan mengembalikan (path, jumlah baris)"""
+    output = create_excel_file(df)
+    try:
+        with open(path, 'wb') as f:
+            shutil.copyfileobj(output, f)
+    finally:
+        output.close()
+    return path, len(df)
+
+# Level partisi CLI → kolom filter yang ikut menentukan nama file
+EXPORT_LEVELS = {
+    'provinsi': ['provinsi'],
+    'kecamatan': ['provinsi', 'kecamatan'],
+    'desa': ['provinsi', 'kecamatan', 'desa_kelurahan'],
+}
+
+def run_batch_export(level, output_dir='.', workers=None, pattern=SUPAS_FILE_PATTERN):
+    """Mode headless: memuat data sekali, mempartisi per level dan menulis workbook per partisi secara paralel"""
+    timings = {}
+    
+    def log(text):
+        print(text, flush=True)
+    
+    start = time.perf_counter()
+    files = find_supas_files(pattern)
+    if not files:
+        log(f"Tidak ditemukan file {pattern}")
+        return 1
+    
+    manifest = build_file_manifest(files)
+    try:
+        arts_data, message = sync_merge_index(files, workers=workers)
+    except sqlite3.Error as e:
+        log(f"Indeks gabungan tidak tersedia, membaca ulang semua file: {str(e)}")
+        arts_data, message = load_art_rows(files, workers=workers)
+    timings['baca & gabung'] = time.perf_counter() - start
+    log(message)
+    
+    start = time.perf_counter()
+    df_full = process_art_rows(arts_data)
+    if COMPACT_TABLE:
+        # Tipe kolom sama seperti file yang diunduh dari UI
+        df_full = expand_art_table(*compact_art_table(df_full))
+    timings['flatten, kolom perhitungan & sort'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    columns = EXPORT_LEVELS[level]
+    timestamp = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
+    os.makedirs(output_dir, exist_ok=True)
+    
+    partitions = []
+    skipped_rows = 0
+    for key, df_part in df_full.groupby(columns, sort=True, dropna=False):
+        key = key if isinstance(key, tuple) else (key,)
+        if not all(_is_filter_option(value) for value in key):
+            skipped_rows += len(df_part)  # Tidak bisa dipilih dari filter UI
+            continue
+        selection = list(key) + [FILTER_ALL] * (3 - len(key))
+        path = os.path.join(output_dir, build_export_filename(*selection, timestamp))
+        partitions.append((df_part, path))
+    timings['partisi'] = time.perf_counter() - start
+    log(f"{len(partitions)} partisi per {level} dari {len(df_full)} baris ART (manifest: {len(manifest)} file)")
+    
+    start = time.perf_counter()
+    if workers is None:
+        workers = LOAD_WORKERS or os.cpu_count() or 1
+    workers = max(1, min(workers, len(partitions)))
+    
+    written_rows = 0
+    if workers == 1:
+        results = (write_excel_file(df_part, path) for df_part, path in partitions)
+        for path, rows in results:
+            written_rows += rows
+            log(f"  {path} ({rows} baris)")
+    else:
+        with _process_pool(workers) as executor:
+            write = _worker_function('write_excel_file')
+            futures = [executor.submit(write, df_part, path) for df_part, path in partitions]
+            for future in futures:
+                path, rows = future.result()
+                written_rows += rows
+                log(f"  {path} ({rows} baris)")
+    timings['tulis Excel'] = time.perf_counter() - start
+    
+    log("")
+    log("Waktu per tahap:")
+    for stage, seconds in timings.items():
+        log(f"  {stage:<36} {seconds:8.2f} detik")
+    log(f"Ringkasan: {len(partitions)} file, {written_rows} baris ditulis ke {os.path.abspath(output_dir)} ({workers} worker)")
+    if skipped_rows:
+        log(f"  {skipped_rows} baris tanpa {'/'.join(columns)} tidak diexport")
+    return 0
+
+def cli_main(argv=None):
+    """Entry point command line: python supas_converter.py --level desa --output hasil/"""
+    parser = argparse.ArgumentParser(
+        description="Export SUPAS ke satu file Excel per wilayah tanpa UI Streamlit"
+    )
+    parser.add_argument('--level', choices=list(EXPORT_LEVELS), default='desa', help="Level partisi (default: desa)")
+    parser.add_argument('--output', default='.', help="Folder tujuan file Excel (default: folder saat ini)")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses paralel (default: jumlah CPU)")
+    parser.add_argument('--pattern', default=SUPAS_FILE_PATTERN, help=f"Pola file input (default: {SUPAS_FILE_PATTERN})")
+    args = parser.parse_args(argv)
+    
+    return run_batch_export(args.level, args.output, args.workers, args.pattern)
+
+def format_search_result(row):
+    """Label satu hasil pencarian di selectbox"""
+    status = row['status_hubungan'] if _is_filter_option(row['status_hubungan']) else '-'
+    return (
+        f"{row['nama_anggota_keluarga']} ({status}) · KK: {row['nama_kepala_keluarga']} · "
+        f"{row['desa_kelurahan']}, {row['kecamatan']} [{row['cocok']}]"
+    )
+
+def jump_to_search_result(search_results, key):
+    """Callback hasil pencarian: mengisi filter Provinsi → Kepala Keluarga sesuai keluarga yang dipilih"""
+    position = st.session_state.get(key)
+    if position is None:
+        return
+    
+    row = search_results.iloc[position]
+    selectable = True
+    for level in FILTER_LEVELS:
+        # Level tanpa nilai (kosong) tidak bisa dipilih; level di bawahnya dibiarkan 'Semua'
+        selectable = selectable and _is_filter_option(row[level])
+        st.session_state[f'filter_{level}'] = str(row[level]) if selectable else FILTER_ALL
+
+def show_profile_panel(run_id):
+    """Panel sidebar berisi hasil ukur tahap pada run terakhir dan proses latar belakang terbaru"""
+    stages = profile_history(run_id)
+    background = [stage for stage in profile_history() if stage['run'] == 'background'][-5:]
+    
+    with st.sidebar:
+        with st.expander("⏱️ Profil Performa"):
+            if not stages and not background:
+                st.caption("Belum ada tahap yang diukur pada run ini")
+            
+            columns = ['stage', 'seconds', 'rows_in', 'rows_out', 'rss_delta_mb', 'peak_rss_delta_mb']
+            if stages:
+                st.caption(f"Run terakhir: {sum(stage['seconds'] for stage in stages):.3f} detik")
+                st.dataframe(pd.DataFrame(stages)[columns], hide_index=True, use_container_width=True)
+            if background:
+                st.caption("Proses latar belakang terbaru")
+                st.dataframe(pd.DataFrame(background)[columns], hide_index=True, use_container_width=True)
+            if PROFILE_LOG_PATH:
+                st.caption(f"Riwayat lengkap: `{PROFILE_LOG_PATH}`")
+
 def main():
     st.set_page_config(
         page_title="SUPAS JSON to Excel Converter",
@@ -280,6 +2530,17 @@ def main():
         layout="wide"
     )
     
+    if not PROFILE_ENABLED:
+        render_app()
+        return
+    
+    run_id = start_profile_run()
+    try:
+        render_app()
+    finally:
+        show_profile_panel(run_id)
+
+def render_app():
     st.title("📊 SUPAS JSON to Excel Converter")
     st.markdown("Konversi data SUPAS menjadi format Excel dengan filter interaktif")
     
@@ -305,101 +2566,218 @@ def main():
         - Tabel detail muncul saat pilih Kepala Keluarga
         """)
     
-    # Baca semua file SUPAS
-    with st.spinner('Membaca file SUPAS...'):
-        json_data, message = read_all_supas_files()
+        st.header("🔄 Data")
+        if st.button(
+            "Muat Ulang Data", use_container_width=True,
+            help="Membaca ulang semua file SUPAS dari awal: snapshot, indeks gabungan dan database lokal dibuat ulang"
+        ):
+            try:
+                invalidate_saved_data()
+            except (OSError, sqlite3.Error) as e:
+                st.warning(f"Data tersimpan tidak bisa dihapus seluruhnya: {str(e)}")
+            load_supas_dataset.clear()
+            load_stale_snapshot.clear()
+            get_art_database.clear()
+            get_reconciliation.clear()
+            clear_progressive_load()
+            clear_view_cache()
+        
+        # Ukuran cache tampilan bersama, untuk menyesuaikan SUPAS_VIEW_CACHE_MB
+        stats = view_cache_stats()
+        st.caption(
+            f"Cache tampilan: {stats['hits']} hit · {stats['misses']} miss · {stats['evictions']} eviction · "
+            f"{stats['entries']} entri, {stats['bytes'] / 1024 / 1024:.1f}/{VIEW_CACHE_MAX_MB} MB"
+        )
     
-    if json_data is None:
-        st.error(message)
+    files = find_supas_files()
+    if not files:
+        st.error("Tidak ditemukan file supas_extraction*.json di folder ini")
         st.info("Pastikan ada file dengan format `supas_extraction*.json` di folder yang sama dengan program ini")
         return
     
-    st.success(message)
+    # Baca dan proses semua file SUPAS (di-cache berdasarkan manifest file)
+    run_started = datetime.now()
+    manifest = build_file_manifest(files)
+    dataset = None
     
-    # Process data
-    with st.spinner('Memproses data...'):
-        arts_data = extract_arts_from_json(json_data)
-        df_full = pd.DataFrame(arts_data)
-        df_full = add_calculated_columns(df_full)
-        
-        # Sort berdasarkan nks dan nomor_urut_bangunan
-        df_full['_nks_sort'] = pd.to_numeric(df_full['nks'], errors='coerce').fillna(0)
-        df_full['_nomor_urut_bangunan_sort_num'] = pd.to_numeric(df_full['_nomor_urut_bangunan_sort'], errors='coerce').fillna(0)
+    # Folder besar: filter, metrik dan tabel di-query dari database SQLite terindeks
+    if choose_query_backend(manifest) == 'sqlite':
+        with st.spinner('Menyiapkan database SUPAS...'), profile_stage('database_sqlite') as stage:
+            art_db = get_art_database(manifest)
+            stage['rows_out'] = art_db['total_rows'] if art_db is not None else 0
+        if art_db is None:
+            st.error("Tidak ada data ART yang ditemukan")
+            return
         
-        df_full = df_full.sort_values(['_nks_sort', '_nomor_urut_bangunan_sort_num'])
+        st.success(art_db['message'])
+        st.caption("🗄️ Data di-query dari database SQLite lokal")
+        dataset = {
+            'df_full': None, 'df_family': None, 'art_db': art_db['path'], 'art_db_tag': art_db['tag'],
+            'total_rows': art_db['total_rows'],
+        }
+    
+    # Kunci cache tampilan: dataset yang sedang ditampilkan (snapshot lama atau manifest saat ini)
+    view_key = ('sqlite' if dataset is not None else 'pandas', snapshot_tag(manifest))
+    
+    load = get_progressive_load(manifest) if dataset is None and PROGRESSIVE_LOADING else None
+    
+    # Snapshot lama tersedia: tampilkan dulu sambil snapshot baru dibangun di latar belakang. Jika snapshot
+    # lama gagal dimuat, lanjut ke jalur biasa tanpa rebuild latar belakang (agar tidak dibangun dua kali)
+    stale_tag = latest_snapshot_tag()
+    if dataset is None and load is None and stale_tag is not None and stale_tag != snapshot_tag(manifest):
+        try:
+            stale_dataset = load_stale_snapshot(stale_tag)
+        except ValueError:
+            stale_dataset = None
+        rebuild = start_snapshot_rebuild(manifest) if stale_dataset is not None else None
+        if rebuild is not None and rebuild['error']:
+            st.warning(f"Gagal membangun ulang snapshot: {rebuild['error']}")
+        elif rebuild is not None:
+            dataset = stale_dataset
+            view_key = ('pandas', stale_tag)
+            st.info("⏳ File SUPAS berubah; menampilkan snapshot sebelumnya sementara data baru diproses di latar belakang. Muat ulang halaman beberapa saat lagi.")
+    
+    # Belum ada snapshot sama sekali: file dibaca bertahap di latar belakang, UI memakai dataset sementara
+    if dataset is None and PROGRESSIVE_LOADING and load is None and stale_tag is None:
+        start_progressive_load(manifest)
+        load = get_progressive_load(manifest)
+    
+    if load is not None:
+        for error in load['errors']:
+            st.warning(error)
+        if load['error'] is not None:
+            st.warning(f"Pemuatan bertahap gagal, membaca ulang semua file: {load['error']}")
+        elif not load['done']:
+            show_progressive_load_progress(manifest, load['version'])
+            if load['dataset'] is None:
+                return  # Halaman di-rerun oleh progress begitu batch pertama selesai
+            view_key = ('pandas', snapshot_tag(manifest), 'sebagian', load['version'])
+            dataset = load['dataset']
+        else:
+            dataset = load['dataset']
+    
+    if dataset is None:
+        with st.spinner('Membaca dan memproses file SUPAS...'):
+            dataset = load_supas_dataset(manifest)
+    
+    art_db = dataset.get('art_db')
+    df_full, df_family = dataset['df_full'], dataset['df_family']
+    
+    if art_db is None:
+        message, built_at = dataset['message'], dataset['built_at']
+        if df_full is None:
+            st.error(message)
+            st.info("Pastikan ada file dengan format `supas_extraction*.json` di folder yang sama dengan program ini")
+            return
         
-        # Hapus kolom helper untuk sorting
-        df_full = df_full.drop(columns=['_nks_sort', '_nomor_urut_bangunan_sort_num', '_nomor_urut_bangunan_sort'])
+        st.success(message)
+        if dataset['source'] == 'progressive' and not load['done']:
+            st.caption("🧩 Data sementara dari file terbaru; tampilan diperbarui otomatis saat file lain selesai dibaca")
+        elif dataset['loaded_at'] < run_started:
+            st.caption(f"⚡ Data diambil dari cache (diproses pukul {built_at.strftime('%H:%M:%S')})")
+        elif dataset['source'] == 'snapshot':
+            st.caption(f"💾 Data dimuat dari snapshot (diproses pukul {built_at.strftime('%Y-%m-%d %H:%M:%S')})")
+        else:
+            st.caption("🆕 Data baru saja diproses dari file")
+    
+    total_rows = dataset['total_rows'] if art_db is not None else len(df_full)
+    st.success(f"Data berhasil diproses: {total_rows} baris ART")
     
-    st.success(f"Data berhasil diproses: {len(df_full)} baris ART")
+    # Pencarian nama / NIK / No. KK lewat indeks pencarian (dibangun saat pencarian pertama)
+    search_query = st.text_input(
+        "🔎 Cari nama, NIK, atau No. KK",
+        placeholder="Contoh: TABUNI, wenda, 9102632710750001"
+    )
+    if search_query.strip():
+        with st.spinner('Menyiapkan indeks pencarian...'):
+            if art_db is not None:
+                search_index = get_sql_search_index(art_db, dataset['art_db_tag'])
+            else:
+                search_index = dataset_search_index(dataset)
+        
+        with profile_stage('pencarian', total_rows) as stage:
+            search_results = search_art(search_index, search_query)
+            stage['rows_out'] = len(search_results)
+        
+        if len(search_results) == 0:
+            st.info(f"Tidak ada hasil untuk '{search_query}'")
+        else:
+            # Key mengikuti query: query baru memberi selectbox baru (tanpa pilihan), sehingga memilih
+            # posisi yang sama dengan hasil query sebelumnya tetap memicu on_change
+            search_key = f"search_result_{search_query}"
+            st.selectbox(
+                f"Hasil pencarian ({len(search_results)}) — pilih untuk membuka data keluarga",
+                range(len(search_results)),
+                index=None,
+                format_func=lambda position: format_search_result(search_results.iloc[position]),
+                key=search_key,
+                on_change=jump_to_search_result,
+                args=(search_results, search_key)
+            )
     
     # Filter Section
     st.header("🔍 Filter Data")
     
     col1, col2, col3, col4 = st.columns(4)
     
+    # Opsi setiap level diambil dari indeks filter atau query terindeks (tanpa scan DataFrame)
+    if art_db is not None:
+        level_options = lambda prefix: query_filter_options(art_db, prefix)
+    else:
+        filter_index = dataset['filter_index']
+        level_options = lambda prefix: filter_options(filter_index, prefix)
+    
     # Filter Provinsi
     with col1:
-        provinsi_options = ['Semua'] + sorted([p for p in df_full['provinsi'].unique() if p and str(p) != 'nan'])
-        selected_provinsi = st.selectbox("Provinsi", provinsi_options)
-    
-    # Filter data berdasarkan provinsi
-    if selected_provinsi != 'Semua':
-        df_filtered = df_full[df_full['provinsi'] == selected_provinsi]
-    else:
-        df_filtered = df_full.copy()
+        selected_provinsi = st.selectbox("Provinsi", level_options(()), key='filter_provinsi')
     
     # Filter Kecamatan
     with col2:
-        kecamatan_options = ['Semua'] + sorted([k for k in df_filtered['kecamatan'].unique() if k and str(k) != 'nan'])
-        selected_kecamatan = st.selectbox("Kecamatan", kecamatan_options)
-    
-    # Filter data berdasarkan kecamatan
-    if selected_kecamatan != 'Semua':
-        df_filtered = df_filtered[df_filtered['kecamatan'] == selected_kecamatan]
+        selected_kecamatan = st.selectbox("Kecamatan", level_options((selected_provinsi,)), key='filter_kecamatan')
     
     # Filter Desa
     with col3:
-        desa_options = ['Semua'] + sorted([d for d in df_filtered['desa_kelurahan'].unique() if d and str(d) != 'nan'])
-        selected_desa = st.selectbox("Desa/Kelurahan", desa_options)
-    
-    # Filter data berdasarkan desa
-    if selected_desa != 'Semua':
-        df_filtered = df_filtered[df_filtered['desa_kelurahan'] == selected_desa]
+        selected_desa = st.selectbox(
+            "Desa/Kelurahan", level_options((selected_provinsi, selected_kecamatan)), key='filter_desa_kelurahan'
+        )
     
     # Filter Kepala Keluarga
     with col4:
-        kepala_keluarga_options = ['Semua'] + sorted([k for k in df_filtered['nama_kepala_keluarga'].unique() if k and str(k) != 'nan'])
-        selected_kepala_keluarga = st.selectbox("Kepala Keluarga", kepala_keluarga_options)
+        selected_kepala_keluarga = st.selectbox(
+            "Kepala Keluarga", level_options((selected_provinsi, selected_kecamatan, selected_desa)),
+            key='filter_nama_kepala_keluarga'
+        )
     
-    # Filter data berdasarkan kepala keluarga
-    if selected_kepala_keluarga != 'Semua':
-        df_filtered = df_filtered[df_filtered['nama_kepala_keluarga'] == selected_kepala_keluarga]
+    # Ringkasan diambil dari kubus (atau satu query agregat); baris hanya diambil saat
+    # dibutuhkan (tabel detail / download)
+    selection = (selected_provinsi, selected_kecamatan, selected_desa, selected_kepala_keluarga)
+    with profile_stage('ringkasan_filter', total_rows) as stage:
+        if art_db is not None:
+            summary = query_summary(art_db, selection)
+        else:
+            summary = lookup_summary(dataset['summary_cube'], dataset['filter_index'], selection)
+        stage['rows_out'] = summary['total']
     
     # Tampilkan hasil filter
     st.subheader("📋 Hasil Filter")
     
-    # Hitung data yang ditemukan
-    df_ditemukan_filtered = df_filtered[df_filtered['keberadaan'] == 'Ditemukan']
-    
     col_a, col_b, col_c, col_d = st.columns(4)
     with col_a:
-        st.metric("Total Data Awal", len(df_full))
+        st.metric("Total Data Awal", total_rows)
     with col_b:
-        st.metric("Data Setelah Filter", len(df_filtered))
+        st.metric("Data Setelah Filter", summary['total'])
     with col_c:
-        st.metric("Data Ditemukan", len(df_ditemukan_filtered))
+        st.metric("Data Ditemukan", summary['ditemukan'])
     with col_d:
-        percentage = (len(df_ditemukan_filtered) / len(df_full) * 100) if len(df_full) > 0 else 0
+        percentage = (summary['ditemukan'] / total_rows * 100) if total_rows > 0 else 0
         st.metric("% Ditemukan", f"{percentage:.1f}%")
     
-    if len(df_filtered) == 0:
+    if summary['total'] == 0:
         st.warning("Tidak ada data yang sesuai dengan filter yang dipilih")
         return
     
     # Warning jika tidak ada data ditemukan
-    df_ditemukan_check = df_filtered[df_filtered['keberadaan'] == 'Ditemukan']
-    if len(df_ditemukan_check) == 0:
+    if summary['ditemukan'] == 0:
         st.warning("⚠️ Tidak ada ART dengan status 'Ditemukan' pada filter ini")
         st.info("Data tetap bisa didownload, namun tabel detail tidak akan muncul karena tidak ada ART yang ditemukan")
     
@@ -408,48 +2786,33 @@ def main():
         col_x, col_y = st.columns(2)
         
         with col_x:
-            st.write("**Jumlah Keluarga:**", df_filtered['nama_kepala_keluarga'].nunique())
-            st.write("**Jumlah ART (Total):**", len(df_filtered))
+            st.write("**Jumlah Keluarga:**", summary['keluarga'])
+            st.write("**Jumlah ART (Total):**", summary['total'])
             # Tambah info ART yang ditemukan
-            df_ditemukan_all = df_filtered[df_filtered['keberadaan'] == 'Ditemukan']
-            st.write("**Jumlah ART (Ditemukan):**", len(df_ditemukan_all))
+            st.write("**Jumlah ART (Ditemukan):**", summary['ditemukan'])
             
         with col_y:
-            kepala_keluarga_count = len(df_filtered[df_filtered['status_hubungan'] == 'Kepala Keluarga'])
-            kepala_keluarga_ditemukan = len(df_ditemukan_all[df_ditemukan_all['status_hubungan'] == 'Kepala Keluarga'])
-            
-            st.write("**Kepala Keluarga:**", kepala_keluarga_count)
-            st.write("**Kepala Keluarga (Ditemukan):**", kepala_keluarga_ditemukan)
-            st.write("**Anggota Lain (Ditemukan):**", len(df_ditemukan_all) - kepala_keluarga_ditemukan)
+            st.write("**Kepala Keluarga:**", summary['kepala_keluarga'])
+            st.write("**Kepala Keluarga (Ditemukan):**", summary['kepala_keluarga_ditemukan'])
+            st.write("**Anggota Lain (Ditemukan):**", summary['anggota_lain_ditemukan'])
     
     # Tampilkan tabel jika filter sampai kepala keluarga
     if selected_kepala_keluarga != 'Semua':
         st.subheader("📋 Data Anggota Keluarga")
         
-        # Filter hanya ART dengan keberadaan = "Ditemukan"
-        df_ditemukan = df_filtered[df_filtered['keberadaan'] == 'Ditemukan']
-        
-        # Sort berdasarkan prioritas status hubungan dan umur
-        if len(df_ditemukan) > 0:
-            # Buat kolom helper untuk sorting status
-            def get_status_priority(status):
-                status_map = {
-                    'Kepala Keluarga': 1,
-                    'Istri': 2,
-                    'Anak': 3
-                }
-                return status_map.get(status, 4)  # Status lain = prioritas 4
-            
-            df_ditemukan['_status_priority'] = df_ditemukan['status_hubungan'].apply(get_status_priority)
-            
-            # Convert umur to numeric untuk sorting, handle empty values
-            df_ditemukan['_umur_sort'] = pd.to_numeric(df_ditemukan['umur'], errors='coerce').fillna(0)
-            
-            # Sort berdasarkan: 1) status priority (ascending), 2) umur (descending)
-            df_ditemukan = df_ditemukan.sort_values(['_status_priority', '_umur_sort'], ascending=[True, False])
-            
-            # Hapus kolom helper
-            df_ditemukan = df_ditemukan.drop(columns=['_status_priority', '_umur_sort'])
+        # Hanya ART dengan keberadaan = "Ditemukan", diurutkan berdasarkan prioritas status hubungan dan umur
+        def build_family_table():
+            with profile_stage('tabel_keluarga', summary['total']) as stage:
+                if art_db is not None:
+                    df_ditemukan = query_art_rows(art_db, selection, keberadaan='Ditemukan')
+                else:
+                    df_filtered = select_filtered_rows(df_full, filter_index, selection)
+                    df_ditemukan = df_filtered[df_filtered['keberadaan'] == 'Ditemukan']
+                df_ditemukan = sort_family_members(df_ditemukan)
+                stage['rows_out'] = len(df_ditemukan)
+            return df_ditemukan
+        
+        df_ditemukan = cached_view((view_key, 'keluarga', selection), build_family_table)
         
         if len(df_ditemukan) == 0:
             st.warning("Tidak ada anggota keluarga dengan status 'Ditemukan'")
@@ -517,7 +2880,7 @@ def main():
                     
                     # Tampilkan range umur jika ada data umur
                     if 'Umur' in display_df.columns:
-                        umur_data = display_df['Umur'][display_df['Umur'] != '']
+                        umur_data = pd.to_numeric(display_df['Umur'], errors='coerce').dropna().astype(int)
                         if len(umur_data) > 0:
                             try:
                                 umur_min = min(umur_data)
@@ -534,33 +2897,149 @@ def main():
     col_download1, col_download2 = st.columns([2, 1])
     
     with col_download1:
-        if st.button("📥 Generate & Download Excel", type="primary", use_container_width=True):
-            with st.spinner('Membuat file Excel...'):
-                excel_file = create_excel_file(df_filtered)
+        export_format = st.radio(
+            "Format file",
+            available_export_formats(),
+            format_func=lambda name: f"{EXPORT_FORMATS[name]['label']} (.{name})",
+            horizontal=True
+        )
+        export_label = EXPORT_FORMATS[export_format]['label']
+        
+        # File dibuat di thread latar belakang dan disimpan per format dan kombinasi filter,
+        # sehingga rerun tidak membuangnya dan download ulang langsung tersedia
+        export_key = (view_key, selection, export_format)
+        job = get_export_job(export_key)
+        
+        if job is None or job['status'] == 'error':
+            if job is not None:
+                st.error(f"Gagal membuat file {export_label}: {job['error']}")
+            
+            if st.button(f"📥 Generate & Download {export_label}", type="primary", use_container_width=True):
+                def build_export_rows():
+                    with profile_stage('baris_export', total_rows) as stage:
+                        if art_db is not None:
+                            df_rows = query_art_rows(art_db, selection)
+                        else:
+                            df_rows = expand_art_table(select_filtered_rows(df_full, filter_index, selection), df_family)
+                        stage['rows_out'] = len(df_rows)
+                    return df_rows
+                
+                df_export = cached_view((view_key, 'export', selection), build_export_rows)
                 
                 # Generate filename with current timestamp and filter info
                 timestamp = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
-                filter_info = ""
-                if selected_provinsi != 'Semua':
-                    filter_info += f"_{selected_provinsi.replace(' ', '_')}"
-                if selected_kecamatan != 'Semua':
-                    filter_info += f"_{selected_kecamatan.replace(' ', '_')}"
-                if selected_desa != 'Semua':
-                    filter_info += f"_{selected_desa.replace(' ', '_')}"
-                
-                filename = f"supas_art_data{filter_info}_{timestamp}.xlsx"
-                
-                st.download_button(
-                    label="📥 Download File Excel",
-                    data=excel_file,
-                    file_name=filename,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    use_container_width=True
+                filename = build_export_filename(
+                    selected_provinsi, selected_kecamatan, selected_desa, timestamp, extension=export_format
                 )
+                job = start_export_job(export_key, df_export, filename, export_format)
+        
+        if job is not None and job['status'] == 'running':
+            show_export_job_progress(export_key)
+        elif job is not None and job['status'] == 'done':
+            st.download_button(
+                label=f"📥 Download File {export_label}",
+                data=job['data'],
+                file_name=job['filename'],
+                mime=EXPORT_FORMATS[export_format]['mime'],
+                use_container_width=True
+            )
+            st.caption(f"Dibuat pukul {job['finished_at'].strftime('%H:%M:%S')} ({job['size'] / 1024 / 1024:.1f} MB)")
     
     with col_download2:
-        df_ditemukan_download = df_filtered[df_filtered['keberadaan'] == 'Ditemukan']
-        st.info(f"📄 **{len(df_filtered)}** total baris\n✅ **{len(df_ditemukan_download)}** ditemukan\n🏠 **{df_filtered['nama_kepala_keluarga'].nunique()}** keluarga")
+        st.info(f"📄 **{summary['total']}** total baris\n✅ **{summary['ditemukan']}** ditemukan\n🏠 **{summary['keluarga']}** keluarga")
+    
+    # Rekonsiliasi dengan file referensi datar (data_*.json), hanya dihitung jika diminta
+    reference_files = find_reference_files()
+    if reference_files:
+        with st.expander("🔗 Rekonsiliasi Data Referensi"):
+            st.caption(
+                f"{len(reference_files)} file referensi: " + ", ".join(f"`{os.path.basename(f)}`" for f in reference_files)
+                + ". Dicocokkan lewat NIK, lalu No. KK + No. urut anggota untuk NIK placeholder/kosong."
+            )
+            if st.checkbox("Jalankan rekonsiliasi", key='reconcile_reference'):
+                def load_all_art_rows():
+                    if art_db is not None:
+                        return query_art_rows(art_db, (FILTER_ALL,) * len(FILTER_LEVELS))
+                    return expand_art_table(df_full, df_family)
+                
+                with st.spinner('Mencocokkan data referensi...'):
+                    reconciliation, reference_message = get_reconciliation(
+                        view_key, build_file_manifest(reference_files), load_all_art_rows
+                    )
+                
+                if reconciliation is None:
+                    st.error(reference_message)
+                else:
+                    st.success(reference_message)
+                    col_r1, col_r2, col_r3, col_r4 = st.columns(4)
+                    with col_r1:
+                        st.metric("Cocok via NIK", reconciliation['matched_by']['nik'])
+                    with col_r2:
+                        st.metric("Cocok via No. KK + Urut", reconciliation['matched_by']['kk_urut'])
+                    with col_r3:
+                        st.metric("ART Tanpa Referensi", len(reconciliation['unmatched_art']))
+                    with col_r4:
+                        st.metric("Referensi Tanpa ART", len(reconciliation['unmatched_reference']))
+                    
+                    tables = [
+                        ('enriched', "Data Diperkaya", 'rekonsiliasi_diperkaya'),
+                        ('unmatched_art', "ART Tanpa Referensi", 'rekonsiliasi_art_tanpa_referensi'),
+                        ('unmatched_reference', "Referensi Tanpa ART", 'rekonsiliasi_referensi_tanpa_art'),
+                    ]
+                    for tab, (name, title, filename) in zip(st.tabs([title for _, title, _ in tables]), tables):
+                        with tab:
+                            df_table = reconciliation[name]
+                            if len(df_table) > RECONCILE_PREVIEW_ROWS:
+                                st.caption(f"Menampilkan {RECONCILE_PREVIEW_ROWS} dari {len(df_table)} baris; unduh CSV untuk data lengkap")
+                            st.dataframe(df_table.head(RECONCILE_PREVIEW_ROWS), use_container_width=True, hide_index=True)
+                            # CSV dibuat saat tombol diklik, bukan di setiap rerun
+                            st.download_button(
+                                label=f"📥 Download CSV ({len(df_table)} baris)",
+                                data=lambda df_table=df_table: create_csv_file(df_table),
+                                file_name=f"{filename}.csv",
+                                mime=EXPORT_FORMATS['csv']['mime'],
+                                key=f'download_{filename}'
+                            )
+    
+    # Laporan kualitas data (dihitung sekali bersama dataset)
+    with st.expander("🩺 Laporan Kualitas Data"):
+        if st.checkbox("Tampilkan laporan kualitas data", key='quality_report'):
+            quality_report = query_quality_report(art_db) if art_db is not None else dataset['quality_report']
+            df_summary, df_findings = quality_report['ringkasan'], quality_report['temuan']
+            
+            quality_columns = st.columns(len(QUALITY_CHECKS))
+            for column, (check, label) in zip(quality_columns, QUALITY_CHECKS.items()):
+                with column:
+                    unit = "keluarga" if check in QUALITY_FAMILY_CHECKS else "ART"
+                    st.metric(label, f"{int(df_summary[check].sum())} {unit}")
+            
+            st.caption("Jumlah temuan per kecamatan/desa (pemeriksaan keluarga dihitung per keluarga, lainnya per ART)")
+            st.dataframe(df_summary, use_container_width=True, hide_index=True)
+            
+            st.caption(f"Baris ART dengan temuan: {len(df_findings)}")
+            if len(df_findings) > QUALITY_PREVIEW_ROWS:
+                st.caption(f"Menampilkan {QUALITY_PREVIEW_ROWS} dari {len(df_findings)} baris; unduh CSV untuk data lengkap")
+            st.dataframe(df_findings.head(QUALITY_PREVIEW_ROWS), use_container_width=True, hide_index=True)
+            
+            col_q1, col_q2 = st.columns(2)
+            for column, (df_report, label, filename) in zip((col_q1, col_q2), (
+                (df_summary, "Ringkasan", 'kualitas_data_ringkasan'),
+                (df_findings, "Temuan", 'kualitas_data_temuan'),
+            )):
+                with column:
+                    # CSV dibuat saat tombol diklik, bukan di setiap rerun
+                    st.download_button(
+                        label=f"📥 Download {label} CSV ({len(df_report)} baris)",
+                        data=lambda df_report=df_report: create_csv_file(df_report),
+                        file_name=f"{filename}.csv",
+                        mime=EXPORT_FORMATS['csv']['mime'],
+                        use_container_width=True,
+                        key=f'download_{filename}'
+                    )
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if st.runtime.exists():
+        main()
+    else:
+        # Dijalankan langsung dengan python (bukan streamlit run): mode batch CLI
+        sys.exit(cli_main())
\ No newline at end of file
@@ -0,0 +1,250 @@
+"""Generator data SUPAS sintetis untuk pengujian skala supas_converter.py
+
+File yang dihasilkan mengikuti format supas_extraction_v2_*.json: extraction_summary + records dengan
+page1_blok_i, page2_blok_v, art_list dan art_details berlabel kode (mis. "[190] PYRAMID",
+"01 - 1 - Kepala Keluarga"). Sebagian keluarga muncul di lebih dari satu file dengan status
+success/failed dan timestamp berbeda, sehingga aturan penggabungan ikut teruji.
+
+Contoh penggunaan:
+    python supas_generator.py --arts 1000000 --files 8 --output data_sintetis
+"""
+import argparse
+import json
+import os
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+PROVINSI = "[97] PAPUA PEGUNUNGAN"
+KABUPATEN_KOTA = "[02] JAYAWIJAYA"
+KECAMATAN_PER_KABUPATEN = 40
+DESA_PER_KECAMATAN = 12
+KELUARGA_PER_NKS = 10
+AVERAGE_FAMILY_SIZE = 3.3
+
+SYLLABLES = ['ka', 'ma', 'lo', 'ni', 'ta', 'bu', 'we', 'ri', 'pa', 'so', 'ye', 'mi', 'ku', 'la', 'ne', 'go']
+BULAN = [
+    '01 - Januari', '02 - Februari', '03 - Maret', '04 - April', '05 - Mei', '06 - Juni',
+    '07 - Juli', '08 - Agustus', '09 - September', '10 - Oktober', '11 - November', '12 - Desember'
+]
+KEBERADAAN_KELUARGA = [
+    ('1 - 1 - Ditemukan', 0.62), ('4 - 4 - Keluarga baru', 0.26),
+    ('3 - 3 - Tidak ditemukan', 0.07), ('2 - 2 - Pindah', 0.05),
+]
+KEBERADAAN_ART = [
+    ('1 - 1 – Ditemukan', 0.66), ('2 - 2 – Anggota keluarga baru', 0.25), ('4 - 4 – Pindah', 0.04),
+    ('7 - 7 – Tidak terkonfirmasi', 0.03), ('', 0.01), ('3 - 3 – Meninggal', 0.01),
+]
+STATUS_ANGGOTA = [
+    ('04 - 4 - Anak', 0.80), ('11 - 11- Lainnya', 0.08), ('06 - 6 - Cucu', 0.05),
+    ('09 - 9 - Famili Lain', 0.04), ('07 - 7 - Orangtua', 0.02), ('05 - 5 - Menantu', 0.01),
+]
+PLACEHOLDER_NIK = ['9999999999999998', '9999999999999997', '9999999999999996', '9999999999999995']
+
+def _weighted(rng, choices):
+    """Memilih label dari daftar (label, bobot)"""
+    labels, weights = zip(*choices)
+    return rng.choices(labels, weights)[0]
+
+def _name(rng, words=2):
+    return ' '.join(
+        ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).upper() for _ in range(words)
+    )
+
+def _nik(rng, placeholder_rate=0.08):
+    if rng.random() < placeholder_rate:
+        return rng.choice(PLACEHOLDER_NIK)
+    return f"9102{rng.randint(0, 10 ** 12 - 1):012d}"
+
+def _location(family_index):
+    """Lokasi keluarga (kecamatan, desa, nks, nomor urut bangunan) dari nomor urut keluarga"""
+    nks_index, nomor_urut = divmod(family_index, KELUARGA_PER_NKS)
+    desa_index = nks_index % (KECAMATAN_PER_KABUPATEN * DESA_PER_KECAMATAN)
+    kecamatan_code, desa_code = divmod(desa_index, DESA_PER_KECAMATAN)
+    return {
+        'kecamatan': f"[{100 + kecamatan_code:03d}] KECAMATAN {kecamatan_code + 1}",
+        'desa_kelurahan': f"[{desa_code + 1:03d}] DESA {kecamatan_code + 1}-{desa_code + 1}",
+        'nks': f"{nks_index + 1:05d}",
+        'nomor_urut_bangunan': str(nomor_urut + 1),
+    }
+
+def _art_detail(rng, nomor_urut, status_hubungan, nama, art_type):
+    umur = rng.randint(0, 80) if status_hubungan != '01 - 1 - Kepala Keluarga' else rng.randint(20, 80)
+    nik = _nik(rng)
+    keberadaan = _weighted(rng, KEBERADAAN_ART)
+    if keberadaan == '':
+        # ART tanpa isian: semua field kosong kecuali nomor urut dan nama
+        detail = dict.fromkeys(['nik', 'keberadaan', 'status_hubungan', 'jenis_kelamin', 'tanggal_lahir', 'bulan_lahir', 'tahun_lahir'], '')
+        detail.update({'nomor_urut_anggota_keluarga': str(nomor_urut), 'nama_anggota_keluarga': nama})
+    else:
+        detail = {
+            'nomor_urut_anggota_keluarga': str(nomor_urut),
+            'nik': nik,
+            'nama_anggota_keluarga': nama,
+            'keberadaan': keberadaan,
+            'status_hubungan': status_hubungan,
+            'jenis_kelamin': rng.choice(['1 - 1 - Laki-laki', '2 - 2 - Perempuan']),
+            'tanggal_lahir': f"{rng.randint(1, 28):02d}",
+            'bulan_lahir': rng.choice(BULAN),
+            'tahun_lahir': str(2025 - umur) if rng.random() > 0.01 else '',
+        }
+    info = f"{nik} / {nama} / {keberadaan[:1] or '-'} – {keberadaan.split('– ')[-1]}"
+    return {'art_info': info, 'art_type': art_type, 'art_index': nomor_urut, 'detail_data': detail}
+
+def generate_family_record(family_index, seed=0):
+    """Record success untuk satu keluarga; isi selalu sama untuk (family_index, seed) yang sama"""
+    rng = random.Random(seed * 1_000_003 + family_index)
+    family_size = max(1, min(12, round(rng.expovariate(1 / (AVERAGE_FAMILY_SIZE - 1))) + 1))
+    kepala = _name(rng)
+    nomor_kk = _nik(rng, placeholder_rate=0.15)
+    location = _location(family_index)
+
+    art_details = []
+    for nomor_urut in range(1, family_size + 1):
+        if nomor_urut == 1:
+            status_hubungan, nama = '01 - 1 - Kepala Keluarga', kepala
+        elif nomor_urut == 2 and rng.random() < 0.7:
+            status_hubungan, nama = '03 - 3 - Istri', _name(rng)
+        else:
+            status_hubungan, nama = _weighted(rng, STATUS_ANGGOTA), f"{_name(rng, 1)} {kepala.split()[-1]}"
+        art_type = 'awal' if rng.random() < 0.73 else 'tambahan'
+        art_details.append(_art_detail(rng, nomor_urut, status_hubungan, nama, art_type))
+
+    art_list = {'art_awal': [], 'art_tambahan': []}
+    for art in art_details:
+        art_list[f"art_{art['art_type']}"].append({
+            'urut': art['art_index'],
+            'art_index': art['art_index'],
+            'info': art['art_info'],
+            'selector': f"#nested_ak > div > div:nth-child({art['art_index']}) > div > button",
+        })
+
+    return {
+        'id': str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        'status': 'success',
+        'data': {
+            'form_info': {'title': 'SUPAS 2025 - P', 'description': 'FASIH'},
+            'user_info': {'name': 'N/A'},
+            'page1_blok_i': {
+                'waktu_mulai_kunjungan_1': '2025-07-14T18:38:00',
+                'waktu_mulai_kunjungan_2': '',
+                'provinsi': PROVINSI,
+                'kabupaten_kota': KABUPATEN_KOTA,
+                'kecamatan': location['kecamatan'],
+                'desa_kelurahan': location['desa_kelurahan'],
+                'klasifikasi_desa': '2',
+                'sls': location['desa_kelurahan'].split('] ')[-1],
+                'nks': location['nks'],
+            },
+            'page2_blok_v': {
+                'no_urut_keluarga_terbesar': str(KELUARGA_PER_NKS),
+                'nomor_urut_keluarga': location['nomor_urut_bangunan'],
+                'nama_kepala_keluarga': kepala,
+                'keberadaan_keluarga': _weighted(rng, KEBERADAAN_KELUARGA),
+                'no_urut_bangunan_terbesar': str(KELUARGA_PER_NKS),
+                'nomor_urut_bangunan': location['nomor_urut_bangunan'],
+                'alamat_tempat_tinggal': location['desa_kelurahan'].split('] ')[-1],
+                'nomor_kartu_keluarga': nomor_kk,
+                # Sesekali tidak sama dengan jumlah ART, seperti pada data lapangan
+                'jumlah_anggota_keluarga': str(family_size + (1 if rng.random() < 0.05 else 0)),
+            },
+            'art_list': art_list,
+            'art_details': art_details,
+        },
+    }
+
+def family_file_plan(family_index, files, duplicate_rate, failed_rate, seed=0):
+    """Daftar (nomor_file, status) tempat keluarga ini muncul: file utama plus kemungkinan duplikat"""
+    rng = random.Random(seed * 7_000_003 + family_index)
+    primary = family_index % files
+    plan = [(primary, 'failed' if rng.random() < failed_rate else 'success')]
+    if files > 1 and rng.random() < duplicate_rate:
+        other = (primary + rng.randint(1, files - 1)) % files
+        plan.append((other, 'failed' if rng.random() < failed_rate else 'success'))
+    return plan
+
+def _failed_record(record_id, timestamp):
+    return {
+        'id': record_id,
+        'extraction_timestamp': timestamp,
+        'status': 'failed',
+        'data': {},
+        'errors': [],
+        'error_message': "page.waitForSelector: Timeout 20000ms exceeded.",
+    }
+
+def generate_supas_files(output_dir, arts, files=4, duplicate_rate=0.1, failed_rate=0.03, seed=0):
+    """Menulis file supas_extraction_v2_*.json sintetis dengan total sekitar `arts` ART unik
+
+    Record ditulis satu per satu ke file (tanpa menampung seluruh isi di memori), sehingga bisa
+    dipakai untuk jutaan ART. Mengembalikan daftar path file yang ditulis.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    families = max(1, round(arts / AVERAGE_FAMILY_SIZE))
+    base_time = datetime(2025, 8, 13, 20, 0, tzinfo=timezone.utc)
+
+    # Rencana per file dihitung dulu agar extraction_summary bisa ditulis di awal file seperti aslinya
+    file_families = [[] for _ in range(files)]
+    for family_index in range(families):
+        for file_number, status in family_file_plan(family_index, files, duplicate_rate, failed_rate, seed):
+            file_families[file_number].append((family_index, status))
+
+    paths = []
+    for file_number, entries in enumerate(file_families):
+        started = base_time + timedelta(days=file_number)
+        completed = started + timedelta(seconds=20 * len(entries))
+        completed_label = completed.strftime('%Y-%m-%dT%H-%M-%S-') + f"{file_number:03d}Z"
+        path = os.path.join(output_dir, f"supas_extraction_v2_{completed_label}.json")
+        failed = sum(1 for _, status in entries if status == 'failed')
+
+        summary = {
+            'total_records': len(entries),
+            'successful_extractions': len(entries) - failed,
+            'failed_extractions': failed,
+            'success_rate': f"{(len(entries) - failed) / max(len(entries), 1) * 100:.2f}%",
+            'extraction_completed_at': completed.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'extraction_method': 'multi_page_with_art_details_fixed_v2',
+        }
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{\n  "extraction_summary": ')
+            f.write(json.dumps(summary, ensure_ascii=False))
+            f.write(',\n  "records": [')
+            for record_number, (family_index, status) in enumerate(entries, start=1):
+                record = generate_family_record(family_index, seed)
+                timestamp = (started + timedelta(seconds=20 * record_number)).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+                if status == 'failed':
+                    record = _failed_record(record['id'], timestamp)
+                else:
+                    record = {
+                        'id': record['id'],
+                        'record_number': record_number,
+                        'extraction_timestamp': timestamp,
+                        'status': status,
+                        'data': record['data'],
+                    }
+                f.write(',\n    ' if record_number > 1 else '\n    ')
+                f.write(json.dumps(record, ensure_ascii=False))
+            f.write('\n  ]\n}\n')
+        paths.append(path)
+
+    return paths
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generator file supas_extraction_v2_*.json sintetis")
+    parser.add_argument('--arts', type=int, default=100000, help="Perkiraan jumlah ART unik (default: 100000)")
+    parser.add_argument('--files', type=int, default=4, help="Jumlah file yang ditulis (default: 4)")
+    parser.add_argument('--output', default='supas_sintetis', help="Folder output (default: supas_sintetis)")
+    parser.add_argument('--duplicate-rate', type=float, default=0.1, help="Porsi keluarga yang juga muncul di file lain")
+    parser.add_argument('--failed-rate', type=float, default=0.03, help="Porsi record berstatus failed")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    paths = generate_supas_files(
+        args.output, args.arts, args.files, args.duplicate_rate, args.failed_rate, args.seed
+    )
+    for path in paths:
+        print(f"{path} ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,543 @@
+"""Test supas_converter.py
+
+Menjalankan: python -m pytest -q
+"""
+import glob
+import itertools
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import supas_converter as sc
+
+SAMPLE_FILES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'supas_extraction*.json')))
+CALCULATED_COLUMNS = ['umur', 'kelas', 'sekolah', 'lulus_sd', 'lulus_smp', 'lulus_sma']
+
+def reference_add_calculated_columns(df):
+    """Implementasi lama (per baris dengan df.apply) sebagai acuan untuk versi vektor"""
+    # Set random seed for reproducible results (optional)
+    np.random.seed(42)
+    
+    # Kolom umur (berdasarkan September 2025)
+    def calculate_umur(row):
+        try:
+            tahun_lahir = int(row['tahun_lahir']) if row['tahun_lahir'] and str(row['tahun_lahir']).isdigit() else None
+            bulan_lahir_text = str(row['bulan_lahir']).lower()
+            
+            if not tahun_lahir:
+                return ''
+            
+            # Mapping bulan ke angka
+            bulan_mapping = {
+                'januari': 1, 'februari': 2, 'maret': 3, 'april': 4,
+                'mei': 5, 'juni': 6, 'juli': 7, 'agustus': 8,
+                'september': 9, 'oktober': 10, 'november': 11, 'desember': 12
+            }
+            
+            bulan_lahir_num = None
+            for bulan_name, bulan_num in bulan_mapping.items():
+                if bulan_name in bulan_lahir_text:
+                    bulan_lahir_num = bulan_num
+                    break
+            
+            if not bulan_lahir_num:
+                return ''
+            
+            # Perhitungan umur berdasarkan September 2025 (bulan ke-9)
+            if bulan_lahir_num <= 9:  # September atau sebelumnya
+                umur = 2025 - tahun_lahir
+            else:  # Setelah September
+                umur = 2025 - tahun_lahir - 1
+            
+            return umur if umur >= 0 else ''
+        except:
+            return ''
+    
+    df['umur'] = df.apply(calculate_umur, axis=1)
+    
+    # Kolom kelas dan sekolah berdasarkan umur (6-18 tahun)
+    def calculate_kelas_sekolah(row):
+        try:
+            umur = row['umur']
+            if umur == '' or not isinstance(umur, (int, float)):
+                return '', ''
+            
+            umur = int(umur)
+            
+            # Umur 6-12: SD (kelas 1-6, diluar usia +1)
+            if 6 <= umur <= 12:
+                kelas = umur - 5  # umur 6 = kelas 1, umur 12 = kelas 6
+                if kelas > 6:
+                    kelas = 6
+                return f"{kelas}", "SD"
+            # Umur 13-15: SMP (kelas 1-3)
+            elif 13 <= umur <= 15:
+                kelas = umur - 12  # umur 13 = kelas 1, umur 15 = kelas 3
+                return f"{kelas}", "SMP"
+            # Umur 16-18: SMA (kelas 1-3)
+            elif 16 <= umur <= 18:
+                kelas = umur - 15  # umur 16 = kelas 1, umur 18 = kelas 3
+                return f"{kelas}", "SMA"
+            else:
+                return '', ''
+        except:
+            return '', ''
+    
+    # Terapkan fungsi kelas dan sekolah
+    kelas_sekolah_data = df.apply(calculate_kelas_sekolah, axis=1, result_type='expand')
+    df['kelas'] = kelas_sekolah_data[0]
+    df['sekolah'] = kelas_sekolah_data[1]
+    
+    # Kolom pendidikan - lulus_sd, lulus_smp, lulus_sma
+    def calculate_lulus_sd(row):
+        try:
+            tahun_lahir = int(row['tahun_lahir']) if row['tahun_lahir'] and str(row['tahun_lahir']).isdigit() else None
+            return tahun_lahir + 12 if tahun_lahir else ''
+        except:
+            return ''
+    
+    def calculate_lulus_smp(row):
+        try:
+            tahun_lahir = int(row['tahun_lahir']) if row['tahun_lahir'] and str(row['tahun_lahir']).isdigit() else None
+            return tahun_lahir + 15 if tahun_lahir else ''
+        except:
+            return ''
+    
+    def calculate_lulus_sma(row):
+        try:
+            tahun_lahir = int(row['tahun_lahir']) if row['tahun_lahir'] and str(row['tahun_lahir']).isdigit() else None
+            return tahun_lahir + 18 if tahun_lahir else ''
+        except:
+            return ''
+    
+    df['lulus_sd'] = df.apply(calculate_lulus_sd, axis=1)
+    df['lulus_smp'] = df.apply(calculate_lulus_smp, axis=1)
+    df['lulus_sma'] = df.apply(calculate_lulus_sma, axis=1)
+    
+    return df
+
+@pytest.fixture(scope='module')
+def sample_art_rows():
+    """Baris ART mentah (belum dibersihkan) hasil gabungan file contoh"""
+    if not SAMPLE_FILES:
+        pytest.skip("File contoh supas_extraction*.json tidak ada")
+    json_data, _ = sc.read_all_supas_files(SAMPLE_FILES)
+    return sc.extract_arts_from_json(json_data, clean=False)
+
+@pytest.fixture(scope='module')
+def sample_arts(sample_art_rows):
+    """Baris ART dari file contoh, sudah dibersihkan seperti di process_art_rows (sebelum kolom perhitungan)"""
+    return sc.clean_label_columns(pd.DataFrame(sample_art_rows))
+
+def test_add_calculated_columns_matches_reference_on_sample_files(sample_arts):
+    expected = reference_add_calculated_columns(sample_arts.copy())
+    pd.testing.assert_frame_equal(sc.add_calculated_columns(sample_arts.copy()), expected)
+
+@pytest.mark.parametrize('tahun_lahir, bulan_lahir, expected', [
+    # Tahun 0 dan tahun bukan angka tidak valid
+    ('0', '05 - Mei', ['', '', '', '', '', '']),
+    ('abc', '05 - Mei', ['', '', '', '', '', '']),
+    ('', '01 - Januari', ['', '', '', '', '', '']),
+    (None, 'Juni', ['', '', '', '', '', '']),
+    ('2010 ', 'Mei', ['', '', '', '', '', '']),
+    # Angka Arab-Indik lolos isdigit() dan int(), sama seperti aturan lama
+    ('\u0662\u0660\u0661\u0660', 'Maret', [15, '3', 'SMP', 2022, 2025, 2028]),
+    # Bulan tidak ada: umur kosong, tahun lulus tetap dihitung
+    ('2019', None, ['', '', '', 2031, 2034, 2037]),
+    ('2019', 'x', ['', '', '', 2031, 2034, 2037]),
+    # Tahun di masa depan: umur negatif dikosongkan
+    ('2030', '01 - Januari', ['', '', '', 2042, 2045, 2048]),
+    # Umur 12 tetap kelas 6 SD, umur 13 pindah ke SMP
+    ('2013', '01 - Januari', [12, '6', 'SD', 2025, 2028, 2031]),
+    ('2012', '10 - Oktober', [12, '6', 'SD', 2024, 2027, 2030]),
+    ('2012', '09 - September', [13, '1', 'SMP', 2024, 2027, 2030]),
+    # Batas bulan referensi (September) dan umur di luar 6-18
+    ('2007', '09 - September', [18, '3', 'SMA', 2019, 2022, 2025]),
+    ('1999', 'Desember', [25, '', '', 2011, 2014, 2017]),
+    ('2020', '02 - Februari', [5, '', '', 2032, 2035, 2038]),
+])
+def test_add_calculated_columns_edge_cases(tahun_lahir, bulan_lahir, expected):
+    df = pd.DataFrame({'tahun_lahir': [tahun_lahir], 'bulan_lahir': [bulan_lahir]})
+    result = sc.add_calculated_columns(df.copy())
+    assert result[CALCULATED_COLUMNS].iloc[0].tolist() == expected
+    pd.testing.assert_frame_equal(result, reference_add_calculated_columns(df.copy()))
+
+def test_add_calculated_columns_edge_cases_together():
+    df = pd.DataFrame({
+        'tahun_lahir': ['2010', '', '0', 'abc', '2030', '1999', None, '2019', '2007', '2009', '\u0662\u0660\u0661\u0660', '2013'],
+        'bulan_lahir': ['10 - Oktober', '01 - Januari', '05 - Mei', 'x', '01 - Januari', 'Desember', 'Juni', None,
+                        '09 - September', '12 - Desember', 'Maret', '01 - Januari'],
+    })
+    pd.testing.assert_frame_equal(sc.add_calculated_columns(df.copy()), reference_add_calculated_columns(df.copy()))
+
+def test_compact_art_table_invalid_numbers(sample_art_rows):
+    rows = [dict(row) for row in sample_art_rows]
+    rows[0]['tahun_lahir'] = '2.5'
+    rows[1]['nomor_urut_anggota_keluarga'] = '99999999999'
+    rows[2]['jumlah_anggota_keluarga'] = '-3000000000'
+    rows[3]['tahun_lahir'] = '1990.0'
+
+    dataset = sc.dataset_from_art_rows(rows, '')
+    assert dataset['df_full'] is not None
+    full = sc.expand_art_table(dataset['df_full'], dataset['df_family'])
+    for column in ('tahun_lahir', 'nomor_urut_anggota_keluarga', 'jumlah_anggota_keluarga'):
+        assert str(full[column].dtype) == 'Int32'
+    assert full.loc[0, 'tahun_lahir'] is pd.NA
+    assert full.loc[1, 'nomor_urut_anggota_keluarga'] is pd.NA
+    assert full.loc[2, 'jumlah_anggota_keluarga'] is pd.NA
+    assert full.loc[3, 'tahun_lahir'] == 1990
+
+    if sc.PARQUET_AVAILABLE:
+        exported = pd.read_parquet(sc.create_parquet_file(full))
+        assert len(exported) == len(full)
+        assert exported.columns.get_loc('nks_angka') == exported.columns.get_loc('nks') + 1
+        assert str(exported['nks_angka'].dtype) == 'Int32'
+        assert exported['nks'].astype(str).tolist() == full['nks'].astype(str).tolist()
+        expected_nks = pd.to_numeric(full['nks'].astype(str).replace('', np.nan)).astype('Int32')
+        pd.testing.assert_series_equal(exported['nks_angka'], expected_nks.reset_index(drop=True), check_names=False)
+
+def full_merge(files):
+    """Hasil gabungan acuan: read_all_supas_files + extract_arts_from_json (seperti loader awal)"""
+    json_data, _ = sc.read_all_supas_files(files)
+    return sc.extract_arts_from_json(json_data, clean=False)
+
+def write_conflict_file(path, source):
+    """File baru berisi record yang sudah ada: timestamp sama (tetap yang lama), lebih baru (mengganti),
+    gagal (tidak mengganti) dan ID ganda di file yang sama"""
+    with open(source, 'r', encoding='utf-8') as f:
+        records = [record for record in json.load(f)['records'] if record['status'] == 'success'][:30]
+    newer = []
+    for i, record in enumerate(records):
+        record = json.loads(json.dumps(record))
+        if i % 3 == 1:
+            record['extraction_timestamp'] = '2099-01-01T00:00:00.000Z'
+            record['data']['page2_blok_v']['nama_kepala_keluarga'] = f"PENGGANTI {i}"
+        elif i % 3 == 2:
+            record['status'] = 'failed'
+        newer.append(record)
+    duplicate = json.loads(json.dumps(newer[4]))
+    duplicate['extraction_timestamp'] = '2099-06-01T00:00:00.000Z'
+    duplicate['data']['page2_blok_v']['nama_kepala_keluarga'] = "PENGGANTI GANDA"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'records': newer + [duplicate]}, f)
+
+@pytest.fixture
+def sample_dir(tmp_path):
+    """Salinan file contoh di folder sementara (boleh diubah oleh test)"""
+    if not SAMPLE_FILES:
+        pytest.skip("File contoh supas_extraction*.json tidak ada")
+    for file_path in SAMPLE_FILES:
+        shutil.copy(file_path, tmp_path)
+    return tmp_path
+
+def _supas_files(folder):
+    return sorted(glob.glob(os.path.join(str(folder), 'supas_extraction*.json')))
+
+def test_merge_index_incremental_equals_full_rebuild(sample_dir):
+    index_path = str(sample_dir / 'index.sqlite')
+    files = _supas_files(sample_dir)
+
+    # Indeks awal dari file lama saja, lalu file baru ditambahkan di akhir (jalur inkremental)
+    rows, _ = sc.sync_merge_index(files[:3], index_path)
+    assert rows == full_merge(files[:3])
+    rows, message = sc.sync_merge_index(files, index_path)
+    assert '2 file baru diproses, 3 dari indeks' in message
+    assert rows == full_merge(files)
+
+    # File dengan record bentrok (timestamp sama/lebih baru, gagal, ID ganda) ditambahkan
+    write_conflict_file(str(sample_dir / 'supas_extraction_v2_2099-01-01T00-00-00-000Z.json'), files[0])
+    files = _supas_files(sample_dir)
+    rows, message = sc.sync_merge_index(files, index_path)
+    assert '1 file baru diproses' in message
+    expected = full_merge(files)
+    assert rows == expected
+    assert {row['nama_kepala_keluarga'] for row in rows} >= {'PENGGANTI 1', 'PENGGANTI GANDA'}
+    assert 'PENGGANTI 4' not in {row['nama_kepala_keluarga'] for row in rows}
+
+    # File lama diubah: indeks dibangun ulang, hasilnya tetap sama dengan gabungan penuh
+    with open(files[2], 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    data['records'] = data['records'][:100]
+    with open(files[2], 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.utime(files[2], ns=(0, 0))
+    rows, _ = sc.sync_merge_index(files, index_path)
+    assert rows == full_merge(files)
+    assert rows == sc.sync_merge_index(files, str(sample_dir / 'rebuild.sqlite'))[0]
+
+    # File dihapus
+    os.remove(files[1])
+    files = _supas_files(sample_dir)
+    rows, _ = sc.sync_merge_index(files, index_path)
+    assert rows == full_merge(files)
+    assert rows == sc.sync_merge_index(files, str(sample_dir / 'rebuild_after_remove.sqlite'))[0]
+
+def test_invalidate_saved_data_forces_full_rebuild(sample_dir):
+    index_path = str(sample_dir / 'index.sqlite')
+    snapshot_dir = str(sample_dir / 'snapshot')
+    db_path = str(sample_dir / 'art.sqlite')
+    files = _supas_files(sample_dir)
+    manifest = sc.build_file_manifest(files)
+    rows, _ = sc.sync_merge_index(files, index_path)
+    tag = sc.save_dataset_snapshot(sc.dataset_from_art_rows(rows, ''), manifest, snapshot_dir)
+    open(db_path, 'w').close()
+    assert sc.latest_snapshot_tag(snapshot_dir) == tag
+
+    sc.invalidate_saved_data(snapshot_dir, index_path, db_path)
+    assert sc.latest_snapshot_tag(snapshot_dir) is None
+    assert not os.path.exists(db_path)
+    _, message = sc.sync_merge_index(files, index_path)
+    assert 'dari indeks' not in message
+
+def progressive_merge(files):
+    """Gabungan seperti _run_progressive_load: file dibaca dari yang terbaru ke yang terlama"""
+    merged = {}
+    for rank in range(len(files) - 1, -1, -1):
+        entries, error = sc.flatten_supas_file(files[rank])
+        assert error is None
+        sc.merge_file_newest_first(merged, rank, entries)
+    return sc.merged_art_rows(merged)
+
+def test_progressive_merge_equals_full_merge(sample_dir):
+    files = _supas_files(sample_dir)
+    assert progressive_merge(files) == full_merge(files)
+
+    # Dengan file berisi record bentrok dan ID ganda di file yang sama, diletakkan di tengah maupun di akhir
+    write_conflict_file(str(sample_dir / 'supas_extraction_v2_2025-10-01T00-00-00-000Z.json'), files[0])
+    write_conflict_file(str(sample_dir / 'supas_extraction_v2_2099-01-01T00-00-00-000Z.json'), files[2])
+    files = _supas_files(sample_dir)
+    assert progressive_merge(files) == full_merge(files)
+
+    # Setiap dataset sementara (sebagian file terbaru) sama dengan gabungan penuh file-file tersebut
+    for first in range(len(files)):
+        merged = {}
+        for rank in range(len(files) - 1, first - 1, -1):
+            sc.merge_file_newest_first(merged, rank, sc.flatten_supas_file(files[rank])[0])
+        assert sc.merged_art_rows(merged) == full_merge(files[first:])
+
+@pytest.fixture(scope='module')
+def sample_dataset(sample_art_rows):
+    """Bundle dataset dari file contoh seperti di aplikasi (tabel ringkas + indeks filter + kubus ringkasan)"""
+    return sc.prepare_dataset(sc.dataset_from_art_rows(sample_art_rows, ''))
+
+def mask_rows(df, selection):
+    """Acuan: baris terpilih dengan boolean mask per level (seperti UI sebelum indeks filter)"""
+    mask = np.ones(len(df), dtype=bool)
+    for level, value in zip(sc.FILTER_LEVELS, selection):
+        if value != sc.FILTER_ALL:
+            mask &= (df[level] == value).to_numpy()
+    return df[mask]
+
+def reference_options(df, prefix):
+    """Acuan: opsi selectbox level berikutnya dari baris hasil mask"""
+    values = mask_rows(df, prefix)[sc.FILTER_LEVELS[len(prefix)]].unique()
+    return [sc.FILTER_ALL] + sorted(value for value in values if value and str(value) != 'nan')
+
+def filter_selections(df, step=7):
+    """Pilihan filter dari kombinasi lokasi yang ada (sebagian), dengan 'Semua' di setiap kemungkinan level
+    termasuk di tengah, ditambah nilai yang tidak ada di data"""
+    combinations = [
+        combination for combination in df[sc.FILTER_LEVELS].drop_duplicates().itertuples(index=False)
+        if all(value and str(value) != 'nan' for value in combination)
+    ][::step]
+    selections = {
+        tuple(value if use else sc.FILTER_ALL for value, use in zip(combination, used))
+        for combination in combinations
+        for used in itertools.product([True, False], repeat=len(sc.FILTER_LEVELS))
+    }
+    first = combinations[0]
+    selections |= {
+        (first[0], 'TIDAK ADA', sc.FILTER_ALL, sc.FILTER_ALL),
+        (sc.FILTER_ALL, sc.FILTER_ALL, first[2], 'TIDAK ADA'),
+        (first[0], first[1], sc.FILTER_ALL, first[3]),
+    }
+    return sorted(selections, key=str)
+
+def test_filter_index_matches_boolean_mask(sample_dataset):
+    df, filter_index = sample_dataset['df_full'], sample_dataset['filter_index']
+    selections = filter_selections(df)
+    assert any(sc.FILTER_ALL in selection[1:3] and selection[3] != sc.FILTER_ALL for selection in selections)
+
+    prefixes = {selection[:depth] for selection in selections for depth in range(len(sc.FILTER_LEVELS))}
+    for prefix in sorted(prefixes, key=str):
+        assert sc.filter_options(filter_index, prefix) == reference_options(df, prefix), prefix
+
+    for selection in selections:
+        selected = sc.select_filtered_rows(df, filter_index, selection)
+        assert selected.index.tolist() == mask_rows(df, selection).index.tolist(), selection
+
+def test_summary_cube_matches_masked_rows(sample_dataset):
+    df, filter_index = sample_dataset['df_full'], sample_dataset['filter_index']
+    for selection in filter_selections(df) + [(sc.FILTER_ALL,) * len(sc.FILTER_LEVELS)]:
+        expected = sc.summarize_art_rows(mask_rows(df, selection))
+        assert sc.lookup_summary(sample_dataset['summary_cube'], filter_index, selection) == expected, selection
+
+def test_summary_cube_missing_family_names():
+    df = pd.DataFrame({
+        'provinsi': ['P1'] * 6,
+        'kecamatan': ['K1', 'K1', 'K1', 'K2', 'K2', 'K2'],
+        'desa_kelurahan': ['D1', 'D1', 'D2', 'D1', 'D1', 'D3'],
+        'nama_kepala_keluarga': ['A', np.nan, 'B', 'A', np.nan, 'C'],
+        'keberadaan': ['Ditemukan', 'Ditemukan', 'Tidak Ditemukan', 'Ditemukan', 'Ditemukan', 'Ditemukan'],
+        'status_hubungan': ['Kepala Keluarga', 'Anak', 'Kepala Keluarga', 'Istri', 'Kepala Keluarga', 'Anak'],
+    })
+    filter_index = sc.build_filter_index(df)
+    summary_cube = sc.build_summary_cube(df, filter_index)
+    for selection in [
+        ('Semua', 'Semua', 'Semua', 'Semua'), ('P1', 'Semua', 'Semua', 'Semua'), ('P1', 'K1', 'D1', 'Semua'),
+        ('P1', 'Semua', 'D1', 'Semua'), ('Semua', 'Semua', 'D1', 'A'), ('Semua', 'K2', 'Semua', 'Semua'),
+        ('P1', 'K2', 'D9', 'Semua'),
+    ]:
+        expected = sc.summarize_art_rows(mask_rows(df, selection))
+        assert sc.lookup_summary(summary_cube, filter_index, selection) == expected, selection
+
+def reference_name_search(frame, query):
+    """Acuan pencarian nama brute force: {label baris: (jenis, skor)} dengan aturan yang sama seperti search_art
+    (awalan nama/kata = 'Awalan'; selain itu setiap kata query harus mirip (Jaccard trigram) dengan satu kata nama)"""
+    def normalize(value):
+        return ' '.join(re.sub(r'[^0-9A-Z]+', ' ', str(value).upper()).split())
+
+    def trigrams(text):
+        padded = f"  {text} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def similarity(a, b):
+        a, b = trigrams(a), trigrams(b)
+        return len(a & b) / len(a | b)
+
+    name = normalize(query)
+    results = {}
+    for label, member, head in zip(frame.index, frame['nama_anggota_keluarga'], frame['nama_kepala_keluarga']):
+        best = None
+        for row_name in (normalize(member), normalize(head)):
+            if not row_name:
+                continue
+            if row_name.startswith(name) or (' ' not in name and any(word.startswith(name) for word in row_name.split())):
+                best = ('Awalan', 1.0)
+                break
+            scores = [max(similarity(word, row_word) for row_word in row_name.split()) for word in name.split()]
+            if min(scores) >= sc.SEARCH_MIN_SIMILARITY:
+                score = round(float(sum(scores)) / len(scores), 2)
+                if best is None or score > best[1]:
+                    best = ('Mirip', score)
+        if best is not None:
+            results[label] = best
+    return results
+
+@pytest.mark.parametrize('query', ['tabuni', 'TABUNY', 'buku palek', 'wen', 'yikwa merdina', 'kogoia'])
+def test_search_names_match_brute_force(sample_dataset, query):
+    frame = sc.search_frame(sample_dataset['df_full'], sample_dataset['df_family']).reset_index(drop=True)
+    search_index = sc.build_search_index(frame)
+    found = sc.search_art(search_index, query, limit=len(frame))
+    expected = reference_name_search(frame, query)
+    assert expected
+    assert dict(zip(found.index, zip(found['cocok'], found['skor']))) == expected
+    assert found['skor'].is_monotonic_decreasing
+
+def test_search_numbers_exact(sample_dataset):
+    frame = sc.search_frame(sample_dataset['df_full'], sample_dataset['df_family']).reset_index(drop=True)
+    search_index = sc.build_search_index(frame)
+    nik = frame['nik'].astype(str)
+    real_nik = nik[nik.str.fullmatch(r'\d{16}') & ~sc.placeholder_mask(nik)].iloc[0]
+    found = sc.search_art(search_index, real_nik[:8] + ' ' + real_nik[8:])
+    assert found.index.tolist() == frame.index[nik == real_nik].tolist()
+    assert set(found['cocok']) == {'NIK'}
+
+    kk = frame['nomor_kartu_keluarga'].astype(str)
+    real_kk = kk[kk.str.fullmatch(r'\d{16}')].iloc[0]
+    assert set(sc.search_art(search_index, real_kk, limit=len(frame)).index) >= set(frame.index[kk == real_kk])
+
+    placeholder = nik[sc.placeholder_mask(nik)]
+    if len(placeholder):
+        assert sc.search_art(search_index, placeholder.iloc[0]).empty
+
+RECONCILE_KEY_COLUMNS = ['nik', 'nomor_kartu_keluarga', 'nomor_urut_anggota_keluarga', 'nks', 'nama_anggota_keluarga']
+REFERENCE_FILES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data_*.json')))
+
+def reference_reconcile_pairs(df_art, df_ref):
+    """Acuan rekonsiliasi dengan loop dict: per pass, kunci dipasangkan hanya jika tepat satu baris di setiap
+    sisi (di antara baris yang belum cocok); hasil {posisi ART: (posisi referensi, kunci_join)}"""
+    pairs = {}
+    ref_matched = set()
+    for key_name, art_keys, ref_keys in zip(('nik', 'kk_urut'), sc.reconciliation_keys(df_art), sc.reconciliation_keys(df_ref)):
+        art_by_key, ref_by_key = {}, {}
+        for position, key in enumerate(art_keys):
+            if key and position not in pairs:
+                art_by_key.setdefault(key, []).append(position)
+        for position, key in enumerate(ref_keys):
+            if key and position not in ref_matched:
+                ref_by_key.setdefault(key, []).append(position)
+        for key, art_positions in art_by_key.items():
+            if len(art_positions) == 1 and len(ref_by_key.get(key, [])) == 1:
+                pairs[art_positions[0]] = (ref_by_key[key][0], key_name)
+                ref_matched.add(ref_by_key[key][0])
+    return pairs
+
+def reconcile_pairs(df_art, df_ref):
+    """reconcile_reference dengan kolom penanda posisi; hasil ({posisi ART: (posisi referensi, kunci_join)}, hasil)"""
+    result = sc.reconcile_reference(
+        df_art.assign(posisi_art=range(len(df_art))), df_ref.assign(posisi_referensi=range(len(df_ref)))
+    )
+    enriched = result['enriched']
+    pairs = {
+        art_position: (ref_position, key)
+        for art_position, ref_position, key in zip(enriched['posisi_art'], enriched['posisi_referensi'], enriched['kunci_join'])
+    }
+    return pairs, result
+
+def test_reconcile_ambiguity_and_duplicate_rules():
+    kk_placeholder = '9999999999999999'
+    df_art = pd.DataFrame([
+        ('9101000000000001', '9101000000000100', '1', '00785', 'ANA'),        # 0: cocok lewat NIK
+        ('9101000000000002', '9101000000000200', '01', '00785', 'BUDI'),      # 1: NIK ganda di ART → pass 2 (No. urut 01 = 1)
+        ('9101000000000002', '9101000000000200', '2', '00785', 'CICI'),       # 2: NIK ganda, No. KK|urut tidak ada di referensi
+        ('9999999999990001', '9101000000000300', '3', '00785', 'DODI'),       # 3: NIK placeholder → pass 2
+        ('9101000000000004', '9101000000000400', '1', '00785', 'EKA'),        # 4: NIK & No. KK|urut ganda di referensi → tidak cocok
+        ('', kk_placeholder, '1', '00785', 'FANI'),                           # 5: No. KK placeholder + nks + nama
+        ('', kk_placeholder, '1', '00798', 'GITA'),                           # 6: No. KK placeholder, nks lain
+        ('', kk_placeholder, '2', '00798', ''),                               # 7: No. KK placeholder tanpa nama → tidak ikut
+        ('9101000000000005', '', '', '00785', 'HANA'),                        # 8: NIK tidak ada di referensi, tanpa No. KK
+    ], columns=RECONCILE_KEY_COLUMNS)
+    df_ref = pd.DataFrame([
+        ('9101000000000001', '9101000000000100', '1', '785', 'ANA', '100'),
+        ('', '9101000000000200', '1', '785', 'BUDI', '200'),
+        ('9101000000000300', '9101000000000300', '3', '785', 'DODI', '300'),
+        ('9101000000000004', '9101000000000400', '1', '785', 'EKA', '400'),
+        ('9101000000000004', '9101000000000400', '1', '785', 'EKA', '401'),
+        ('', kk_placeholder, '01', '785', 'Fani', '500'),
+        ('', kk_placeholder, '1', '798', 'GITA', '600'),
+        ('', kk_placeholder, '2', '798', '', '700'),
+    ], columns=RECONCILE_KEY_COLUMNS + ['gaji'])
+    df_ref['sumber_referensi'] = 'data_uji.json'
+
+    pairs, result = reconcile_pairs(df_art, df_ref)
+    expected = {0: (0, 'nik'), 1: (1, 'kk_urut'), 3: (2, 'kk_urut'), 5: (5, 'kk_urut'), 6: (6, 'kk_urut')}
+    assert pairs == expected
+    assert reference_reconcile_pairs(df_art, df_ref) == expected
+    assert result['matched_by'] == {'nik': 1, 'kk_urut': 4}
+    assert result['enriched']['gaji'].tolist() == ['100', '200', '300', '500', '600']
+    assert result['unmatched_art'].index.tolist() == [2, 4, 7, 8]
+    assert result['unmatched_reference'].index.tolist() == [3, 4, 7]
+
+def test_reconcile_sample_files_match_dict_reference(sample_dataset):
+    if not REFERENCE_FILES:
+        pytest.skip("File referensi data_*.json tidak ada")
+    df_art = sc.expand_art_table(sample_dataset['df_full'], sample_dataset['df_family'])
+    df_ref, _ = sc.read_reference_files(REFERENCE_FILES)
+    pairs, result = reconcile_pairs(df_art, df_ref)
+    expected = reference_reconcile_pairs(df_art, df_ref)
+    assert expected
+    assert pairs == expected
+    assert result['matched_by'] == {
+        key_name: sum(1 for _, key in expected.values() if key == key_name) for key_name in ('nik', 'kk_urut')
+    }
+    assert result['unmatched_art']['posisi_art'].tolist() == [position for position in range(len(df_art)) if position not in expected]
+    matched_ref = {ref_position for ref_position, _ in expected.values()}
+    assert result['unmatched_reference']['posisi_referensi'].tolist() == [
+        position for position in range(len(df_ref)) if position not in matched_ref
+    ]